@@ -0,0 +1,89 @@
+from argparse import ArgumentParser
+from ast import ClassDef, parse, unparse
+from pathlib import Path
+from random import randint, random, sample, seed, choices
+from re import compile, escape as re_escape
+from string import ascii_letters
+from timeit import repeat
+
+RSS_MODULE = Path(__file__).resolve().parent.parent / "bot" / "modules" / "rss.py"
+
+
+def load_rss_filter():
+    # bot.modules.rss starts the whole bot on import, so only RssFilter is loaded
+    tree = parse(RSS_MODULE.read_text())
+    node = next(
+        n for n in tree.body if isinstance(n, ClassDef) and n.name == "RssFilter"
+    )
+    namespace = {"compile": compile, "re_escape": re_escape}
+    exec(unparse(node), namespace)
+    return namespace["RssFilter"]
+
+
+def legacy_match(item_title, data):
+    sensitive = data.get("sensitive", False)
+    for flist in data["inf"]:
+        if (sensitive and all(x.lower() not in item_title.lower() for x in flist)) or (
+            not sensitive and all(x not in item_title for x in flist)
+        ):
+            return False
+    for flist in data["exf"]:
+        if (sensitive and any(x.lower() in item_title.lower() for x in flist)) or (
+            not sensitive and any(x in item_title for x in flist)
+        ):
+            return False
+    return True
+
+
+def make_filter(words, inf_groups, inf_words, exf_words):
+    return {
+        "inf": [sample(words, inf_words) for _ in range(inf_groups)],
+        "exf": [sample(words, 1) for _ in range(exf_words)],
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Compare RssFilter with the old RSS loops")
+    parser.add_argument("--titles", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    RssFilter = load_rss_filter()
+    seed(1)
+    words = ["".join(choices(ascii_letters, k=randint(3, 8))) for _ in range(400)]
+    titles = [".".join(choices(words, k=12)) for _ in range(args.titles)]
+
+    for _ in range(2000):
+        data = make_filter(words, randint(0, 4), randint(1, 4), randint(0, 6))
+        data["sensitive"] = random() < 0.5
+        rss_filter = RssFilter(data["inf"], data["exf"], data["sensitive"])
+        for title in sample(titles, 50):
+            assert rss_filter.match(title) == legacy_match(title, data)
+    print("RssFilter matches the old loops on 100000 random filter/title pairs")
+
+    for inf_groups, inf_words, exf_words in [(3, 2, 3), (8, 5, 20), (15, 8, 60)]:
+        data = make_filter(words, inf_groups, inf_words, exf_words)
+        for sensitive in (False, True):
+            data["sensitive"] = sensitive
+            rss_filter = RssFilter(data["inf"], data["exf"], sensitive)
+            old = min(
+                repeat(
+                    lambda: [legacy_match(t, data) for t in titles],
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            new = min(
+                repeat(
+                    lambda: [rss_filter.match(t) for t in titles],
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            print(
+                f"inf {inf_groups}x{inf_words}, exf {exf_words}, sensitive={sensitive}: {old * 1000:.0f} ms -> {new * 1000:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
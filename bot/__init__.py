@@ -23,6 +23,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pyrogram import utils as pyroutils
 
 from .core.config_manager import BinConfig
+from .core.task_registry import TaskRegistry
 from sabnzbdapi import SabnzbdClient
 
 getLogger("requests").setLevel(WARNING)
@@ -64,7 +65,7 @@ nzb_options = {}
 queued_dl = {}
 queued_up = {}
 status_dict = {}
-task_dict = {}
+task_dict = TaskRegistry()
 rss_dict = {}
 shortener_dict = {}
 var_list = [
@@ -92,7 +93,6 @@ queue_dict_lock = Lock()
 qb_listener_lock = Lock()
 nzb_listener_lock = Lock()
 jd_listener_lock = Lock()
-cpu_eater_lock = Lock()
 same_directory_lock = Lock()
 
 sabnzbd_client = SabnzbdClient(
@@ -83,6 +83,7 @@ from pyrogram.handlers import CallbackQueryHandler
 
 from .core.handlers import add_handlers
 from .helper.ext_utils.bot_utils import new_task
+from .helper.ext_utils.hyperdl_utils import MediaSessionPool
 from .helper.telegram_helper.filters import CustomFilters
 from .helper.telegram_helper.message_utils import (
     delete_message,
@@ -99,6 +100,7 @@ async def restart_sessions_confirm(_, query):
         reply_to = message.reply_to_message
         restart_message = await send_message(reply_to, "Restarting Session(s)...")
         await delete_message(message)
+        await MediaSessionPool.close_all()
         await TgClient.reload()
         add_handlers()
         TgClient.bot.add_handler(
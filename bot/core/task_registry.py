@@ -0,0 +1,71 @@
+from logging import getLogger
+
+LOGGER = getLogger(__name__)
+
+
+class TaskRegistry(dict):
+    def __init__(self):
+        super().__init__()
+        self._gids = {}
+        self._mid_gids = {}
+        self._users = {}
+
+    def __setitem__(self, mid, task):
+        if mid in self:
+            self._unindex(mid)
+        super().__setitem__(mid, task)
+        self._users.setdefault(task.listener.user_id, {})[mid] = task
+        self._index_gid(mid, task)
+
+    def __delitem__(self, mid):
+        self._unindex(mid)
+        super().__delitem__(mid)
+
+    def pop(self, mid, *args):
+        if mid in self:
+            self._unindex(mid)
+        return super().pop(mid, *args)
+
+    def clear(self):
+        super().clear()
+        self._gids.clear()
+        self._mid_gids.clear()
+        self._users.clear()
+
+    def _index_gid(self, mid, task):
+        try:
+            gid = task.gid()
+        except AttributeError as e:
+            LOGGER.warning(f"Task {mid} has no gid yet: {e}")
+            return
+        if gid:
+            self._gids[gid] = mid
+            self._mid_gids[mid] = gid
+
+    def _unindex(self, mid):
+        task = self[mid]
+        if (user_tasks := self._users.get(task.listener.user_id)) is not None:
+            user_tasks.pop(mid, None)
+            if not user_tasks:
+                del self._users[task.listener.user_id]
+        if (gid := self._mid_gids.pop(mid, None)) and self._gids.get(gid) == mid:
+            del self._gids[gid]
+
+    def by_user(self, user_id):
+        return list(self._users.get(user_id, {}).values())
+
+    def by_gid(self, gid):
+        if (mid := self._gids.get(gid)) is not None and mid in self:
+            task = self[mid]
+            try:
+                if task.gid() == gid:
+                    return task
+            except AttributeError as e:
+                LOGGER.warning(f"Task {mid} has no gid yet: {e}")
+        return None
+
+    def reindex_gids(self):
+        self._gids.clear()
+        self._mid_gids.clear()
+        for mid, task in self.items():
+            self._index_gid(mid, task)
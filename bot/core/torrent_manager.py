@@ -1,7 +1,8 @@
-from asyncio import TimeoutError, gather
+from asyncio import Lock, TimeoutError, gather
 from contextlib import suppress
 from inspect import iscoroutinefunction
 from pathlib import Path
+from time import time
 
 from aioaria2 import Aria2WebsocketClient
 from aiohttp import ClientError
@@ -139,6 +140,61 @@ class TorrentManager:
             aria2_options[key] = value
 
 
+class TorrentSnapshot:
+    INTERVAL = 1
+    ARIA2_KEYS = [
+        "gid",
+        "status",
+        "totalLength",
+        "completedLength",
+        "uploadLength",
+        "downloadSpeed",
+        "uploadSpeed",
+        "connections",
+        "numSeeders",
+        "seeder",
+        "followedBy",
+        "dir",
+        "files",
+        "bittorrent",
+    ]
+
+    _qb_torrents = {}
+    _qb_time = 0
+    _qb_lock = Lock()
+    _aria2_downloads = {}
+    _aria2_time = 0
+    _aria2_lock = Lock()
+
+    @classmethod
+    async def qbittorrent(cls, tag):
+        async with cls._qb_lock:
+            if time() - cls._qb_time >= cls.INTERVAL:
+                torrents = await TorrentManager.qbittorrent.torrents.info()
+                cls._qb_torrents = {
+                    t_tag: torrent for torrent in torrents for t_tag in torrent.tags
+                }
+                cls._qb_time = time()
+        return cls._qb_torrents.get(tag)
+
+    @classmethod
+    async def aria2(cls, gid):
+        async with cls._aria2_lock:
+            if time() - cls._aria2_time >= cls.INTERVAL:
+                results = await gather(
+                    TorrentManager.aria2.tellActive(cls.ARIA2_KEYS),
+                    TorrentManager.aria2.tellWaiting(0, 1000, cls.ARIA2_KEYS),
+                    TorrentManager.aria2.tellStopped(0, 1000, cls.ARIA2_KEYS),
+                )
+                cls._aria2_downloads = {
+                    download["gid"]: download for res in results for download in res
+                }
+                cls._aria2_time = time()
+        if (download := cls._aria2_downloads.get(gid)) is None:
+            download = await TorrentManager.aria2.tellStatus(gid)
+        return download
+
+
 def aria2_name(download_info):
     if "bittorrent" in download_info and download_info["bittorrent"].get("info"):
         return download_info["bittorrent"]["info"]["name"]
@@ -1,5 +1,5 @@
 import re
-from asyncio import gather, sleep
+from asyncio import Queue, Semaphore, gather, sleep
 from contextlib import suppress
 from os import path as ospath, walk
 from re import sub
@@ -13,7 +13,7 @@ from pyrogram.enums import ChatAction
 from .. import (
     DOWNLOAD_DIR,
     LOGGER,
-    cpu_eater_lock,
+    bot_loop,
     excluded_extensions,
     intervals,
     multi_tags,
@@ -26,13 +26,13 @@ from ..core.tg_client import TgClient
 from .ext_utils.bot_utils import get_size_bytes, new_task, sync_to_async
 from .ext_utils.bulk_links import extract_bulk_links
 from .ext_utils.files_utils import (
+    EXTRACT_WORKERS,
     SevenZ,
     get_base_name,
     get_path_size,
     is_archive,
     is_archive_split,
     is_first_archive_split,
-    split_file,
 )
 from .ext_utils.links_utils import (
     is_gdrive_id,
@@ -41,6 +41,11 @@ from .ext_utils.links_utils import (
     is_telegram_link,
     is_mega_link,
 )
+from .ext_utils.media_scheduler import (
+    ENCODE_WEIGHT,
+    get_ffmpeg_weight,
+    media_scheduler,
+)
 from .ext_utils.media_utils import (
     FFMpeg,
     create_thumb,
@@ -74,7 +79,9 @@ class TaskConfig:
             if isinstance(v, dict):
                 setattr(self, f"{k.lower()}_dict", v)
             elif isinstance(v, str):
-                setattr(self, f"{k.lower()}_dict", self.metadata_processor.parse_string(v))
+                setattr(
+                    self, f"{k.lower()}_dict", self.metadata_processor.parse_string(v)
+                )
             else:
                 setattr(self, f"{k.lower()}_dict", {})
         self.dir = f"{DOWNLOAD_DIR}{self.mid}"
@@ -136,6 +143,8 @@ class TaskConfig:
         self.thumb = None
         self.excluded_extensions = []
         self.files_to_proceed = []
+        self.split_files = {}
+        self.split_queues = {}
         self.is_super_chat = self.message.chat.type.name in ["SUPERGROUP", "CHANNEL"]
         self.source_url = None
         self.bot_pm = Config.BOT_PM or self.user_dict.get("BOT_PM")
@@ -644,27 +653,45 @@ class TaskConfig:
         LOGGER.info(f"Extracting: {self.name}")
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Extract")
-        for dirpath, _, files in await sync_to_async(
-            walk, self.up_dir or self.dir, topdown=False
-        ):
-            code = 0
-            for file_ in files:
+        semaphore = Semaphore(EXTRACT_WORKERS)
+
+        async def extract(dirpath, file_):
+            async with semaphore:
                 if self.is_cancelled:
                     return False
-                if (
-                    is_first_archive_split(file_)
+                self.proceed_count += 1
+                f_path = ospath.join(dirpath, file_)
+                t_path = get_base_name(f_path) if self.is_file else dirpath
+                if not self.is_file:
+                    self.subname = file_
+                return await sevenz.extract(f_path, t_path, pswd)
+
+        async def extract_dir(dirpath, archives):
+            return [await extract(dirpath, file_) for file_ in archives]
+
+        dirs = [
+            (
+                dirpath,
+                files,
+                [
+                    file_
+                    for file_ in files
+                    if is_first_archive_split(file_)
                     or is_archive(file_)
                     and not file_.strip().lower().endswith(".rar")
-                ):
-                    self.proceed_count += 1
-                    f_path = ospath.join(dirpath, file_)
-                    t_path = get_base_name(f_path) if self.is_file else dirpath
-                    if not self.is_file:
-                        self.subname = file_
-                    code = await sevenz.extract(f_path, t_path, pswd)
-            if self.is_cancelled:
-                return code
-            if code == 0:
+                ],
+            )
+            for dirpath, _, files in await sync_to_async(
+                walk, self.up_dir or self.dir, topdown=False
+            )
+        ]
+        results = await gather(
+            *(extract_dir(dirpath, archives) for dirpath, _, archives in dirs)
+        )
+        if self.is_cancelled:
+            return False
+        for (dirpath, files, _), codes in zip(dirs, results):
+            if all(code == 0 for code in codes):
                 for file_ in files:
                     if is_archive_split(file_) or is_archive(file_):
                         del_path = ospath.join(dirpath, file_)
@@ -672,7 +699,10 @@ class TaskConfig:
                             await remove(del_path)
                         except Exception:
                             self.is_cancelled = True
-        return t_path if self.is_file and code == 0 else dl_path
+        codes = [code for dir_codes in results for code in dir_codes]
+        if self.is_file and codes and all(code == 0 for code in codes):
+            return get_base_name(dl_path)
+        return dl_path
 
     async def proceed_ffmpeg(self, dl_path, gid):
         checked = False
@@ -733,7 +763,7 @@ class TaskConfig:
                                 self, ffmpeg, gid, "FFmpeg"
                             )
                         self.progress = False
-                        await cpu_eater_lock.acquire()
+                        await media_scheduler.acquire(self, get_ffmpeg_weight(cmd))
                         self.progress = True
                     LOGGER.info(f"Running ffmpeg cmd for: {file_path}")
                     cmd[index + 1] = file_path
@@ -790,7 +820,9 @@ class TaskConfig:
                                         self, ffmpeg, gid, "FFmpeg"
                                     )
                                 self.progress = False
-                                await cpu_eater_lock.acquire()
+                                await media_scheduler.acquire(
+                                    self, get_ffmpeg_weight(cmd)
+                                )
                                 self.progress = True
                             LOGGER.info(f"Running ffmpeg cmd for: {f_path}")
                             self.subsize = await get_path_size(f_path)
@@ -806,7 +838,7 @@ class TaskConfig:
                                         await move(res[0], newres)
         finally:
             if checked:
-                cpu_eater_lock.release()
+                media_scheduler.release(self)
         return dl_path
 
     async def substitute(self, dl_path):
@@ -957,7 +989,7 @@ class TaskConfig:
             async with task_dict_lock:
                 task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Convert")
             self.progress = False
-            async with cpu_eater_lock:
+            async with media_scheduler.job(self, ENCODE_WEIGHT):
                 self.progress = True
                 for f_path, f_type in self.files_to_proceed.items():
                     self.proceed_count += 1
@@ -1007,7 +1039,7 @@ class TaskConfig:
             async with task_dict_lock:
                 task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Sample Video")
             self.progress = False
-            async with cpu_eater_lock:
+            async with media_scheduler.job(self, ENCODE_WEIGHT):
                 self.progress = True
                 LOGGER.info(f"Creating Sample video: {self.name}")
                 for f_path, file_ in self.files_to_proceed.items():
@@ -1066,6 +1098,7 @@ class TaskConfig:
             async with task_dict_lock:
                 task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Split")
             LOGGER.info(f"Splitting: {self.name}")
+            videos = {}
             for f_path, (f_size, file_) in self.files_to_proceed.items():
                 self.proceed_count += 1
                 if self.is_file:
@@ -1078,19 +1111,28 @@ class TaskConfig:
                     split_size = (f_size // parts) + (f_size % parts)
                 else:
                     split_size = self.split_size
-                if not self.as_doc and (await get_document_type(f_path))[0]:
-                    self.progress = True
-                    res = await ffmpeg.split(f_path, file_, parts, split_size)
-                else:
-                    self.progress = False
-                    res = await split_file(f_path, split_size, self)
-                if self.is_cancelled:
-                    return False
-                if res or f_size >= self.max_split_size:
-                    try:
-                        await remove(f_path)
-                    except Exception:
-                        self.is_cancelled = True
+                if self.as_doc or not (await get_document_type(f_path))[0]:
+                    self.split_files[ospath.normpath(f_path)] = split_size
+                    continue
+                videos[f_path] = [f_size, file_, parts, split_size]
+                self.split_queues[ospath.normpath(f_path)] = Queue()
+            if videos:
+                bot_loop.create_task(self._split_videos(ffmpeg, videos))
+
+    async def _split_videos(self, ffmpeg, videos):
+        for f_path, (f_size, file_, parts, split_size) in videos.items():
+            queue = self.split_queues[ospath.normpath(f_path)]
+            res = False
+            if not self.is_cancelled:
+                try:
+                    res = await ffmpeg.split(
+                        f_path, file_, parts, split_size, queue.put_nowait
+                    )
+                except Exception as e:
+                    LOGGER.error(f"{e}. Split Video: {f_path}")
+            if not res and f_size > self.max_split_size:
+                self.split_files[ospath.normpath(f_path)] = split_size
+            queue.put_nowait(None if res else False)
 
     def parse_metadata_string(self, metadata_str):
         return self.metadata_processor.parse_string(metadata_str)
@@ -2,9 +2,11 @@ from aioshutil import rmtree as aiormtree, move
 from asyncio import create_subprocess_exec, sleep, wait_for
 from asyncio.subprocess import PIPE
 from contextlib import suppress
+from io import SEEK_CUR, SEEK_END, SEEK_SET, RawIOBase
 from psutil import disk_usage
 from os import path as ospath, readlink, walk
 from re import I, escape, search as re_search, split as re_split
+from threading import local
 
 from aiofiles.os import (
     listdir,
@@ -17,7 +19,7 @@ from aiofiles.os import (
 )
 from magic import Magic
 
-from ... import DOWNLOAD_DIR, LOGGER
+from ... import DOWNLOAD_DIR, LOGGER, cpu_no
 from ...core.torrent_manager import TorrentManager
 from .bot_utils import cmd_exec, sync_to_async
 from .exceptions import NotSupportedExtractionArchive
@@ -89,6 +91,40 @@ ARCH_EXT = [
     ".crc64",
 ]
 
+MIME_TYPES = {
+    ".mkv": "video/x-matroska",
+    ".mp4": "video/mp4",
+    ".m4v": "video/x-m4v",
+    ".webm": "video/webm",
+    ".avi": "video/x-msvideo",
+    ".mov": "video/quicktime",
+    ".flv": "video/x-flv",
+    ".wmv": "video/x-ms-wmv",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".flac": "audio/flac",
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".wav": "audio/x-wav",
+    ".aac": "audio/aac",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".pdf": "application/pdf",
+    ".zip": "application/zip",
+    ".rar": "application/x-rar",
+    ".7z": "application/x-7z-compressed",
+    ".srt": "application/x-subrip",
+    ".txt": "text/plain",
+    ".nfo": "text/plain",
+    ".json": "application/json",
+    ".epub": "application/epub+zip",
+    ".apk": "application/vnd.android.package-archive",
+}
+
+_magic = local()
 
 FIRST_SPLIT_REGEX = (
     r"\.part0*1\.rar$|\.7z\.0*1$|\.zip\.0*1$|^(?!.*\.part\d+\.rar$).*\.rar$"
@@ -96,6 +132,8 @@ FIRST_SPLIT_REGEX = (
 
 SPLIT_REGEX = r"\.r\d+$|\.7z\.\d+$|\.z\d+$|\.zip\.\d+$|\.part\d+\.rar$"
 
+EXTRACT_WORKERS = min(4, max(1, cpu_no // 2))
+
 
 def is_first_archive_split(file):
     return bool(re_search(FIRST_SPLIT_REGEX, file.lower(), I))
@@ -209,7 +247,10 @@ async def create_recursive_symlink(source, destination):
 def get_mime_type(file_path):
     if ospath.islink(file_path):
         file_path = readlink(file_path)
-    mime = Magic(mime=True)
+    if mime_type := MIME_TYPES.get(ospath.splitext(file_path)[1].lower()):
+        return mime_type
+    if (mime := getattr(_magic, "mime", None)) is None:
+        mime = _magic.mime = Magic(mime=True)
     mime_type = mime.from_file(file_path)
     mime_type = mime_type or "text/plain"
     return mime_type
@@ -272,72 +313,104 @@ async def join_files(opath):
                     await remove(f"{opath}/{file_}")
 
 
-async def split_file(f_path, split_size, listener):
-    out_path = f"{f_path}."
-    if listener.is_cancelled:
-        return False
-    listener.subproc = await create_subprocess_exec(
-        "split",
-        "--numeric-suffixes=1",
-        "--suffix-length=3",
-        f"--bytes={split_size}",
-        f_path,
-        out_path,
-        stderr=PIPE,
-    )
-    _, stderr = await listener.subproc.communicate()
-    code = listener.subproc.returncode
-    if listener.is_cancelled:
-        return False
-    if code == -9:
-        listener.is_cancelled = True
-        return False
-    elif code != 0:
-        try:
-            stderr = stderr.decode().strip()
-        except Exception:
-            stderr = "Unable to decode the error!"
-        LOGGER.error(f"{stderr}. Split Document: {f_path}")
-    return True
+class FilePart(RawIOBase):
+    def __init__(self, path, offset, length, name):
+        self.path = path
+        self.name = name
+        self.offset = offset
+        self.length = length
+        self._position = 0
+        self._file = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position, whence=SEEK_SET):
+        if whence == SEEK_CUR:
+            position += self._position
+        elif whence == SEEK_END:
+            position += self.length
+        self._position = min(max(position, 0), self.length)
+        return self._position
+
+    def read(self, size=-1):
+        remaining = self.length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        self._file.seek(self.offset + self._position)
+        data = self._file.read(size)
+        self._position += len(data)
+        return data
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def get_file_parts(f_path, f_size, split_size):
+    name = ospath.basename(f_path)
+    return [
+        FilePart(f_path, offset, min(split_size, f_size - offset), f"{name}.{i:03}")
+        for i, offset in enumerate(range(0, f_size, split_size), 1)
+    ]
 
 
 class SevenZ:
     def __init__(self, listener):
         self._listener = listener
-        self._processed_bytes = 0
-        self._percentage = "0%"
+        self._jobs = {}
+        self.subprocs = set()
 
     @property
     def processed_bytes(self):
-        return self._processed_bytes
+        return sum(job[1] for job in self._jobs.values())
 
     @property
     def progress(self):
-        return self._percentage
+        if len(self._jobs) == 1:
+            return next(iter(self._jobs.values()))[2]
+        try:
+            return f"{round(self.processed_bytes / self._listener.subsize * 100)}%"
+        except ZeroDivisionError:
+            return "0%"
+
+    def _update_subsize(self):
+        self._listener.subsize = sum(job[0] for job in self._jobs.values())
 
-    async def _sevenz_progress(self):
+    async def _sevenz_progress(self, proc):
+        job = self._jobs[proc] = [0, 0, "0%"]
         pattern = r"(\d+)\s+bytes|Total Physical Size\s*=\s*(\d+)"
         while not (
-            self._listener.subproc.returncode is not None
+            proc.returncode is not None
             or self._listener.is_cancelled
-            or self._listener.subproc.stdout.at_eof()
+            or proc.stdout.at_eof()
         ):
             try:
-                line = await wait_for(self._listener.subproc.stdout.readline(), 2)
+                line = await wait_for(proc.stdout.readline(), 2)
             except Exception:
                 break
             line = line.decode().strip()
             if match := re_search(pattern, line):
-                self._listener.subsize = int(match[1] or match[2])
+                job[0] = int(match[1] or match[2])
+                self._update_subsize()
             await sleep(0.05)
         s = b""
         while not (
             self._listener.is_cancelled
-            or self._listener.subproc.returncode is not None
-            or self._listener.subproc.stdout.at_eof()
+            or proc.returncode is not None
+            or proc.stdout.at_eof()
         ):
             try:
-                char = await wait_for(self._listener.subproc.stdout.read(1), 60)
+                char = await wait_for(proc.stdout.read(1), 60)
             except Exception:
                 break
             if not char:
@@ -345,18 +418,28 @@ class SevenZ:
             s += char
             if char == b"%":
                 try:
-                    self._percentage = s.decode().rsplit(" ", 1)[-1].strip()
-                    self._processed_bytes = (
-                        int(self._percentage.strip("%")) / 100
-                    ) * self._listener.subsize
+                    job[2] = s.decode().rsplit(" ", 1)[-1].strip()
+                    job[1] = (int(job[2].strip("%")) / 100) * job[0]
                 except Exception:
-                    self._processed_bytes = 0
-                    self._percentage = "0%"
+                    job[1] = 0
+                    job[2] = "0%"
                 s = b""
             await sleep(0.05)
 
-        self._processed_bytes = 0
-        self._percentage = "0%"
+        del self._jobs[proc]
+        self._update_subsize()
+
+    async def _run(self, cmd):
+        self._listener.subproc = proc = await create_subprocess_exec(
+            *cmd, stdout=PIPE, stderr=PIPE
+        )
+        self.subprocs.add(proc)
+        try:
+            await self._sevenz_progress(proc)
+            _, stderr = await proc.communicate()
+        finally:
+            self.subprocs.discard(proc)
+        return proc.returncode, stderr
 
     async def extract(self, f_path, t_path, pswd):
         cmd = [
@@ -375,14 +458,7 @@ class SevenZ:
             del cmd[2]
         if self._listener.is_cancelled:
             return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd,
-            stdout=PIPE,
-            stderr=PIPE,
-        )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        code, stderr = await self._run(cmd)
         if self._listener.is_cancelled:
             return False
         if code == -9:
@@ -426,12 +502,7 @@ class SevenZ:
             LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}")
         if self._listener.is_cancelled:
             return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd, stdout=PIPE, stderr=PIPE
-        )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        code, stderr = await self._run(cmd)
         if self._listener.is_cancelled:
             return False
         if code == -9:
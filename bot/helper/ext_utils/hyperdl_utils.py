@@ -6,21 +6,25 @@ from asyncio import (
     wait_for,
     TimeoutError as AsyncTimeoutError,
     Event,
+    Lock,
+    Queue,
+    Semaphore,
+    shield,
 )
 from datetime import datetime
-from math import ceil, floor
+from math import ceil
 from mimetypes import guess_extension
-from os import path as ospath
+from os import O_CREAT, O_WRONLY, close as osclose, ftruncate
+from os import open as osopen, path as ospath, pwrite, replace as osreplace
 from pathlib import Path
 from re import sub
 from sys import argv
 from time import time
 
-from aiofiles import open as aiopen
 from aiofiles.os import makedirs, remove
 from aioshutil import move
 from pyrogram import StopTransmission, raw, utils
-from pyrogram.errors import AuthBytesInvalid, FloodWait
+from pyrogram.errors import AuthBytesInvalid, FileMigrate, FloodWait, Unauthorized
 from pyrogram.file_id import PHOTO_TYPES, FileId, FileType, ThumbnailSource
 from pyrogram.session import Auth, Session
 from pyrogram.session.internals import MsgId
@@ -28,6 +32,138 @@ from pyrogram.session.internals import MsgId
 from ... import LOGGER
 from ...core.config_manager import Config
 from ...core.tg_client import TgClient
+from .bot_utils import sync_to_async
+
+try:
+    from os import posix_fallocate
+except ImportError:
+    posix_fallocate = None
+
+
+class MediaSessionPool:
+    IDLE_TIMEOUT = 10 * 60
+
+    _sessions = {}
+    _refs = {}
+    _last_used = {}
+    _locks = {}
+    _evictor = None
+
+    @classmethod
+    async def acquire(cls, index, client, dc_id):
+        key = (index, dc_id)
+        async with cls._locks.setdefault(key, Lock()):
+            session = cls._sessions.get(key)
+            if session is not None and not session.is_started.is_set():
+                LOGGER.warning(f"HyperDL: dropping dead media session {key}")
+                await cls._stop(cls._sessions.pop(key))
+                session = None
+            if session is None:
+                session = await cls._create(client, dc_id)
+                cls._sessions[key] = session
+            cls._refs[key] = cls._refs.get(key, 0) + 1
+            cls._last_used[key] = time()
+        if cls._evictor is None or cls._evictor.done():
+            cls._evictor = create_task(cls._evict_idle())
+        return session
+
+    @classmethod
+    def release(cls, index, dc_id):
+        key = (index, dc_id)
+        if cls._refs.get(key):
+            cls._refs[key] -= 1
+            cls._last_used[key] = time()
+
+    @classmethod
+    async def invalidate(cls, index, dc_id, stale=None):
+        key = (index, dc_id)
+        async with cls._locks.setdefault(key, Lock()):
+            if stale is not None and cls._sessions.get(key) is not stale:
+                return
+            if session := cls._sessions.pop(key, None):
+                await cls._stop(session)
+
+    @classmethod
+    async def close_all(cls):
+        for key in list(cls._sessions):
+            await cls.invalidate(*key)
+
+    @staticmethod
+    async def _stop(session):
+        try:
+            await session.stop()
+        except Exception as e:
+            LOGGER.error(f"HyperDL: failed to stop media session: {e}")
+
+    @classmethod
+    async def _evict_idle(cls):
+        while cls._sessions:
+            await sleep(60)
+            current_time = time()
+            for key in [
+                k
+                for k, last_used in cls._last_used.items()
+                if not cls._refs.get(k) and current_time - last_used > cls.IDLE_TIMEOUT
+            ]:
+                async with cls._locks.setdefault(key, Lock()):
+                    if cls._refs.get(key):
+                        continue
+                    cls._refs.pop(key, None)
+                    cls._last_used.pop(key, None)
+                    if session := cls._sessions.pop(key, None):
+                        await cls._stop(session)
+
+    @staticmethod
+    async def _create(client, dc_id, max_retries=3):
+        retries = 0
+        while retries < max_retries:
+            try:
+                if dc_id != await client.storage.dc_id():
+                    media_session = Session(
+                        client,
+                        dc_id,
+                        await Auth(
+                            client, dc_id, await client.storage.test_mode()
+                        ).create(),
+                        await client.storage.test_mode(),
+                        is_media=True,
+                    )
+                    await media_session.start()
+
+                    for _ in range(6):
+                        exported_auth = await client.invoke(
+                            raw.functions.auth.ExportAuthorization(dc_id=dc_id)
+                        )
+
+                        try:
+                            await media_session.invoke(
+                                raw.functions.auth.ImportAuthorization(
+                                    id=exported_auth.id, bytes=exported_auth.bytes
+                                )
+                            )
+                            break
+                        except AuthBytesInvalid:
+                            await sleep(1)
+                    else:
+                        await media_session.stop()
+                        raise AuthBytesInvalid
+                else:
+                    media_session = Session(
+                        client,
+                        dc_id,
+                        await client.storage.auth_key(),
+                        await client.storage.test_mode(),
+                        is_media=True,
+                    )
+                    await media_session.start()
+
+                return media_session
+
+            except Exception:
+                retries += 1
+                await sleep(1)
+
+        raise ValueError(f"Failed to create media session after {max_retries} attempts")
 
 
 class HyperTGDownload:
@@ -47,8 +183,20 @@ class HyperTGDownload:
         self.chunk_size = 1024 * 1024
         self.file_name = ""
         self._cancel_event = Event()
-        self.session_pool = {}
-        create_task(self._clean_cache())
+        self._pending_chunks = 0
+        self._chunk_failures = {}
+        self._client_limits = {}
+        self._client_streaks = {}
+        self._slots = None
+        self._user_cancelled = False
+        self.file_unique_id = ""
+        self._bitmap = bytearray()
+        self._bitmap_lock = Lock()
+        self._map_path = ""
+        self._unsaved_chunks = 0
+        self._sessions = {}
+        self._media_sessions = {}
+        self._session_lock = Lock()
 
     @staticmethod
     async def get_media_type(message):
@@ -107,79 +255,6 @@ class HyperTGDownload:
             self.cache_last_access[index] = time()
         return self.cache_file_ref[index]
 
-    async def _clean_cache(self):
-        while True:
-            await sleep(15 * 60)
-            current_time = time()
-            expired_keys = [
-                k
-                for k, v in self.cache_last_access.items()
-                if current_time - v > 45 * 60
-            ]
-
-            for key in expired_keys:
-                if key in self.cache_file_ref:
-                    del self.cache_file_ref[key]
-                if key in self.cache_last_access:
-                    del self.cache_last_access[key]
-
-    async def generate_media_session(self, client, file_id, index, max_retries=3):
-        session_key = (index, file_id.dc_id)
-
-        if session_key in self.session_pool:
-            return self.session_pool[session_key]
-
-        retries = 0
-        while retries < max_retries:
-            try:
-                if file_id.dc_id != await client.storage.dc_id():
-                    media_session = Session(
-                        client,
-                        file_id.dc_id,
-                        await Auth(
-                            client, file_id.dc_id, await client.storage.test_mode()
-                        ).create(),
-                        await client.storage.test_mode(),
-                        is_media=True,
-                    )
-                    await media_session.start()
-
-                    for _ in range(6):
-                        exported_auth = await client.invoke(
-                            raw.functions.auth.ExportAuthorization(dc_id=file_id.dc_id)
-                        )
-
-                        try:
-                            await media_session.invoke(
-                                raw.functions.auth.ImportAuthorization(
-                                    id=exported_auth.id, bytes=exported_auth.bytes
-                                )
-                            )
-                            break
-                        except AuthBytesInvalid:
-                            await sleep(1)
-                    else:
-                        await media_session.stop()
-                        raise AuthBytesInvalid
-                else:
-                    media_session = Session(
-                        client,
-                        file_id.dc_id,
-                        await client.storage.auth_key(),
-                        await client.storage.test_mode(),
-                        is_media=True,
-                    )
-                    await media_session.start()
-
-                self.session_pool[session_key] = media_session
-                return media_session
-
-            except Exception:
-                retries += 1
-                await sleep(1)
-
-        raise ValueError(f"Failed to create media session after {max_retries} attempts")
-
     @staticmethod
     async def get_location(file_id: FileId):
         file_type = file_id.file_type
@@ -219,93 +294,34 @@ class HyperTGDownload:
                 thumb_size=file_id.thumbnail_size,
             )
 
-    async def get_file(
-        self,
-        offset_bytes: int,
-        first_part_cut: int,
-        last_part_cut: int,
-        part_count: int,
-        max_retries=5,
-    ):
-        index = min(self.work_loads, key=self.work_loads.get)
-        client = self.clients[index]
-
-        self.work_loads[index] += 1
-        current_retry = 0
-
-        try:
-            while current_retry < max_retries:
-                try:
-                    if self._cancel_event.is_set():
-                        raise CancelledError("Download cancelled")
-
-                    file_id = await self.get_file_id(client, index)
-                    media_session, location = await gather(
-                        self.generate_media_session(client, file_id, index),
-                        self.get_location(file_id),
-                    )
-
-                    current_part = 1
-                    current_offset = offset_bytes
-
-                    while current_part <= part_count:
-                        if self._cancel_event.is_set():
-                            raise CancelledError("Download cancelled")
-
-                        try:
-                            r = await wait_for(
-                                media_session.invoke(
-                                    raw.functions.upload.GetFile(
-                                        location=location,
-                                        offset=current_offset,
-                                        limit=self.chunk_size,
-                                    ),
-                                ),
-                                timeout=30,
-                            )
-
-                            if isinstance(r, raw.types.upload.File):
-                                chunk = r.bytes
-
-                                if not chunk:
-                                    break
-
-                                if part_count == 1:
-                                    yield chunk[first_part_cut:last_part_cut]
-                                elif current_part == 1:
-                                    yield chunk[first_part_cut:]
-                                elif current_part == part_count:
-                                    yield chunk[:last_part_cut]
-                                else:
-                                    yield chunk
-
-                                current_part += 1
-                                current_offset += self.chunk_size
-                                self._processed_bytes += len(chunk)
-                            else:
-                                raise ValueError(f"Unexpected response: {r}")
-
-                        except (FloodWait, AsyncTimeoutError, ConnectionError) as e:
-                            if isinstance(e, FloodWait):
-                                await sleep(e.value + 1)
-                            else:
-                                await sleep(1)
-                            continue
-
-                    if current_part <= part_count:
-                        raise ValueError(
-                            f"Incomplete download: got {current_part-1} of {part_count} parts"
-                        )
-                    break
-
-                except (AsyncTimeoutError, ConnectionError, AttributeError):
-                    current_retry += 1
-                    if current_retry >= max_retries:
-                        raise
-                    await sleep(current_retry * 2)
-
-        finally:
-            self.work_loads[index] -= 1
+    async def get_chunk(self, media_session, location, offset):
+        r = await wait_for(
+            media_session.invoke(
+                raw.functions.upload.GetFile(
+                    location=location,
+                    offset=offset,
+                    limit=self.chunk_size,
+                ),
+            ),
+            timeout=30,
+        )
+        if not isinstance(r, raw.types.upload.File):
+            raise ValueError(f"Unexpected response: {r}")
+        if len(r.bytes) != min(self.chunk_size, self.file_size - offset):
+            raise ConnectionError(f"Short read at offset {offset}")
+        return r.bytes
+
+    def _throttle(self, index):
+        self._client_limits[index] = max(1, self._client_limits[index] // 2)
+        self._client_streaks[index] = 0
+
+    def _boost(self, index):
+        self._client_streaks[index] += 1
+        if self._client_streaks[index] >= 8:
+            self._client_streaks[index] = 0
+            self._client_limits[index] = min(
+                self.num_parts, self._client_limits[index] + 1
+            )
 
     async def progress_callback(self, progress, progress_args):
         if not progress:
@@ -318,40 +334,168 @@ class HyperTGDownload:
                         self._processed_bytes, self.file_size, *progress_args
                     )
                 await sleep(1)
-            except (CancelledError, StopTransmission):
+            except StopTransmission:
+                self._user_cancelled = True
+                self._cancel_event.set()
+                break
+            except CancelledError:
                 break
             except Exception:
                 await sleep(1)
 
-    async def single_part(self, start, end, part_index, max_retries=3):
-        until_bytes, from_bytes = min(end, self.file_size - 1), start
-
-        offset = from_bytes - (from_bytes % self.chunk_size)
-        first_part_cut = from_bytes - offset
-        last_part_cut = until_bytes % self.chunk_size + 1
+    @property
+    def _map_header(self):
+        return f"{self.file_unique_id}:{self.file_size}:{self.chunk_size}\n".encode()
 
-        part_count = ceil(until_bytes / self.chunk_size) - floor(
-            offset / self.chunk_size
-        )
-        part_file_path = ospath.join(
-            self.directory, f"{self.file_name}.temp.{part_index:02d}"
+    def _load_bitmap(self, temp_file_path, total_chunks):
+        self._bitmap = bytearray((total_chunks + 7) // 8)
+        if not (ospath.exists(temp_file_path) and ospath.exists(self._map_path)):
+            return 0
+        try:
+            with open(self._map_path, "rb") as f:
+                header = f.readline()
+                bitmap = f.read()
+        except OSError:
+            return 0
+        if header != self._map_header or len(bitmap) != len(self._bitmap):
+            return 0
+        self._bitmap[:] = bitmap
+        return sum(
+            min(self.chunk_size, self.file_size - chunk_no * self.chunk_size)
+            for chunk_no in range(total_chunks)
+            if self._chunk_done(chunk_no)
         )
 
-        for attempt in range(max_retries):
+    @staticmethod
+    def _write_bitmap(map_path, header, bitmap):
+        with open(f"{map_path}.tmp", "wb") as f:
+            f.write(header)
+            f.write(bitmap)
+        osreplace(f"{map_path}.tmp", map_path)
+
+    def _chunk_done(self, chunk_no):
+        return self._bitmap[chunk_no >> 3] & (1 << (chunk_no & 7))
+
+    async def _mark_chunk_done(self, chunk_no):
+        self._bitmap[chunk_no >> 3] |= 1 << (chunk_no & 7)
+        self._unsaved_chunks += 1
+        if self._unsaved_chunks >= 32 and not self._bitmap_lock.locked():
+            await self._save_bitmap()
+
+    async def _save_bitmap(self):
+        async with self._bitmap_lock:
+            self._unsaved_chunks = 0
+            await sync_to_async(
+                self._write_bitmap,
+                self._map_path,
+                self._map_header,
+                bytes(self._bitmap),
+            )
+
+    def _allocate_file(self, file_path):
+        fd = osopen(file_path, O_WRONLY | O_CREAT, 0o644)
+        try:
+            ftruncate(fd, self.file_size)
+            if self.file_size and posix_fallocate is not None:
+                try:
+                    posix_fallocate(fd, 0, self.file_size)
+                except OSError as e:
+                    LOGGER.warning(f"HyperDL: fallocate failed, using sparse file: {e}")
+            return fd
+        except Exception:
+            osclose(fd)
+            raise
+
+    @staticmethod
+    def _write_at(fd, data, position):
+        view = memoryview(data)
+        while view:
+            written = pwrite(fd, view, position)
+            view = view[written:]
+            position += written
+
+    async def _write_chunk(self, fd, chunk, position):
+        # the write must land before the fd can be closed, even on cancel
+        write = create_task(sync_to_async(self._write_at, fd, chunk, position))
+        try:
+            await shield(write)
+        except CancelledError:
+            await write
+            raise
+
+    async def prepare_client(self, index):
+        client = self.clients[index]
+        try:
+            file_id = await self.get_file_id(client, index)
+            media_session = await MediaSessionPool.acquire(index, client, file_id.dc_id)
+            self._sessions[index] = file_id.dc_id
+            self._media_sessions[index] = media_session
+            return media_session, await self.get_location(file_id)
+        except Exception as e:
+            LOGGER.warning(f"HyperDL: skipping helper bot {index}: {e}")
+            return None
+
+    async def _refresh_session(self, index, stale, dc_id=None):
+        async with self._session_lock:
+            if (current := self._media_sessions[index]) is not stale:
+                return current
+            if (old_dc := self._sessions.pop(index, None)) is None:
+                raise ValueError(f"No media session left for helper bot {index}")
+            await MediaSessionPool.invalidate(index, old_dc, stale)
+            MediaSessionPool.release(index, old_dc)
+            dc_id = dc_id or old_dc
+            current = await MediaSessionPool.acquire(index, self.clients[index], dc_id)
+            self._sessions[index] = dc_id
+            self._media_sessions[index] = current
+            return current
+
+    async def chunk_worker(
+        self, index, slot, media_session, location, fd, queue, max_retries=5
+    ):
+        while self._pending_chunks and not self._cancel_event.is_set():
+            if slot >= self._client_limits[index]:
+                await sleep(0.5)
+                continue
             try:
-                async with aiopen(part_file_path, "wb") as f:
-                    async for chunk in self.get_file(
-                        offset, first_part_cut, last_part_cut, part_count
-                    ):
-                        if self._cancel_event.is_set():
-                            raise CancelledError("Download cancelled")
-                        await f.write(chunk)
-                return part_index, part_file_path
-            except (AsyncTimeoutError, ConnectionError):
-                if attempt == max_retries - 1:
-                    raise
-                await sleep((attempt + 1) * 2)
-                self._processed_bytes = 0
+                offset = await wait_for(queue.get(), timeout=1)
+            except AsyncTimeoutError:
+                continue
+
+            self.work_loads[index] += 1
+            try:
+                async with self._slots:
+                    chunk = await self.get_chunk(media_session, location, offset)
+                await self._write_chunk(fd, chunk, offset)
+            except (FloodWait, AsyncTimeoutError, ConnectionError) as e:
+                queue.put_nowait(offset)
+                self._throttle(index)
+                self._chunk_failures[offset] = self._chunk_failures.get(offset, 0) + 1
+                if self._chunk_failures[offset] > max_retries * len(self.clients):
+                    raise ValueError(f"Chunk at offset {offset} kept failing: {e}")
+                await sleep(e.value + 1 if isinstance(e, FloodWait) else 1)
+                continue
+            except (Unauthorized, FileMigrate) as e:
+                queue.put_nowait(offset)
+                self._chunk_failures[offset] = self._chunk_failures.get(offset, 0) + 1
+                if self._chunk_failures[offset] > max_retries * len(self.clients):
+                    raise ValueError(f"Chunk at offset {offset} kept failing: {e}")
+                LOGGER.warning(f"HyperDL: renewing media session {index}: {e}")
+                media_session = await self._refresh_session(
+                    index,
+                    media_session,
+                    e.value if isinstance(e, FileMigrate) else None,
+                )
+                continue
+            except BaseException:
+                queue.put_nowait(offset)
+                raise
+            finally:
+                self.work_loads[index] -= 1
+
+            self._pending_chunks -= 1
+            self._processed_bytes += len(chunk)
+            self._boost(index)
+            await self._mark_chunk_done(offset // self.chunk_size)
 
     async def handle_download(self, progress, progress_args):
         self._cancel_event.clear()
@@ -364,50 +508,67 @@ class HyperTGDownload:
             + ".temp"
         )
 
-        num_parts = min(self.num_parts, max(1, self.file_size // (10 * 1024 * 1024)))
-
-        if self.file_size < 10 * 1024 * 1024:
-            num_parts = 1
-
-        part_size = self.file_size // num_parts if num_parts > 0 else self.file_size
-        ranges = [
-            (i * part_size, min((i + 1) * part_size - 1, self.file_size - 1))
-            for i in range(num_parts)
-        ]
+        self._map_path = f"{temp_file_path}.map"
+        total_chunks = ceil(self.file_size / self.chunk_size)
+        self._processed_bytes = await sync_to_async(
+            self._load_bitmap, temp_file_path, total_chunks
+        )
+        queue = Queue()
+        for chunk_no in range(total_chunks):
+            if not self._chunk_done(chunk_no):
+                queue.put_nowait(chunk_no * self.chunk_size)
+        self._pending_chunks = queue.qsize()
+        if self._processed_bytes:
+            LOGGER.info(
+                f"HyperDL: resuming {self.file_name} with {self._pending_chunks} of {total_chunks} chunks left"
+            )
+        self._chunk_failures = {}
+        self._slots = Semaphore(self.num_parts)
+        per_client = max(1, self.num_parts // max(1, len(self.clients)))
+        self._client_limits = dict.fromkeys(self.clients, per_client)
+        self._client_streaks = dict.fromkeys(self.clients, 0)
 
         tasks = []
         prog_task = None
+        fd = None
+        completed = False
 
         try:
-            for i, (start, end) in enumerate(ranges):
-                tasks.append(create_task(self.single_part(start, end, i)))
+            fd = await sync_to_async(self._allocate_file, temp_file_path)
+
+            indexes = list(self.clients)
+            prepared = await gather(*(self.prepare_client(i) for i in indexes))
+            for index, client_media in zip(indexes, prepared):
+                if client_media is None:
+                    continue
+                for slot in range(min(self.num_parts, total_chunks)):
+                    tasks.append(
+                        create_task(
+                            self.chunk_worker(index, slot, *client_media, fd, queue)
+                        )
+                    )
 
             if progress:
                 prog_task = create_task(self.progress_callback(progress, progress_args))
 
-            results = await gather(*tasks)
+            await gather(*tasks)
 
-            async with aiopen(temp_file_path, "wb") as temp_file:
-                for _, part_file_path in sorted(results, key=lambda x: x[0]):
-                    try:
-                        async with aiopen(part_file_path, "rb") as part_file:
-                            while True:
-                                chunk = await part_file.read(8 * 1024 * 1024)
-                                if not chunk:
-                                    break
-                                await temp_file.write(chunk)
-                        await remove(part_file_path)
-                    except Exception as e:
-                        LOGGER.error(
-                            f"Error processing part file {part_file_path}: {e}"
-                        )
-                        raise
+            if self._user_cancelled:
+                raise CancelledError("Download cancelled")
+            if self._pending_chunks:
+                raise ValueError(
+                    f"Incomplete download: {self._pending_chunks} of {total_chunks} chunks missing"
+                )
+
+            osclose(fd)
+            fd = None
 
             if prog_task and not prog_task.done():
                 prog_task.cancel()
 
             file_path = ospath.splitext(temp_file_path)[0]
             await move(temp_file_path, file_path)
+            completed = True
 
             return file_path
 
@@ -426,16 +587,28 @@ class HyperTGDownload:
             for task in tasks:
                 if not task.done():
                     task.cancel()
+            await gather(*tasks, return_exceptions=True)
 
-            for i in range(len(ranges)):
-                part_path = ospath.join(
-                    self.directory, f"{self.file_name}.temp.{i:02d}"
-                )
+            if fd is not None:
+                osclose(fd)
+
+            for index, dc_id in self._sessions.items():
+                MediaSessionPool.release(index, dc_id)
+            self._sessions.clear()
+            self._media_sessions.clear()
+
+            if completed or self._user_cancelled:
+                for path in (temp_file_path, self._map_path):
+                    try:
+                        if ospath.exists(path):
+                            await remove(path)
+                    except OSError as e:
+                        LOGGER.error(f"HyperDL: failed to remove {path}: {e}")
+            else:
                 try:
-                    if ospath.exists(part_path):
-                        await remove(part_path)
-                except Exception:
-                    pass
+                    await self._save_bitmap()
+                except Exception as e:
+                    LOGGER.error(f"HyperDL: failed to save chunk map: {e}")
 
     @staticmethod
     async def get_extension(file_type, mime_type):
@@ -467,6 +640,7 @@ class HyperTGDownload:
         progress=None,
         progress_args=(),
         dump_chat=None,
+        max_attempts=3,
     ):
         try:
             if dump_chat:
@@ -502,7 +676,17 @@ class HyperTGDownload:
                 extension = await self.get_extension(file_type, mime_type)
                 self.file_name = f"{FileType(file_id_obj.file_type).name.lower()}_{(date or datetime.now()).strftime('%Y-%m-%d_%H-%M-%S')}_{MsgId()}{extension}"
 
-            return await self.handle_download(progress, progress_args)
+            self.file_unique_id = getattr(media, "file_unique_id", "")
+
+            for attempt in range(max_attempts):
+                if file_path := await self.handle_download(progress, progress_args):
+                    return file_path
+                if self._user_cancelled or attempt == max_attempts - 1:
+                    return None
+                LOGGER.warning(
+                    f"HyperDL: retrying {self.file_name} from its chunk map ({attempt + 1}/{max_attempts})"
+                )
+                await sleep((attempt + 1) * 5)
 
         except Exception as e:
             LOGGER.error(f"Download media error: {e}")
@@ -0,0 +1,110 @@
+from asyncio import CancelledError
+from contextlib import asynccontextmanager
+from itertools import count
+
+from ... import bot_loop, cpu_no
+
+COPY_WEIGHT = 1
+ENCODE_WEIGHT = max(1, cpu_no // 2)
+MAX_HEAD_SKIPS = 3
+
+_CODEC_ARGS = ("-c", "-codec", "-vcodec", "-acodec", "-scodec")
+_FILTER_ARGS = ("-vf", "-af", "-filter", "-filter_complex", "-lavfi")
+
+
+def get_ffmpeg_weight(cmd):
+    codecs = [
+        cmd[index + 1]
+        for index, arg in enumerate(cmd[:-1])
+        if arg in _CODEC_ARGS or arg.startswith(("-c:", "-codec:"))
+    ]
+    if (
+        codecs
+        and all(codec == "copy" for codec in codecs)
+        and not any(arg.split(":", 1)[0] in _FILTER_ARGS for arg in cmd)
+    ):
+        return COPY_WEIGHT
+    return ENCODE_WEIGHT
+
+
+class MediaScheduler:
+    def __init__(self, budget):
+        self._budget = budget
+        self._used = 0
+        self._running = {}
+        self._waiting = {}
+        self._seq = count()
+        self._head = None
+        self._head_skips = 0
+
+    def _user_load(self, user_id):
+        return sum(1 for uid, _ in self._running.values() if uid == user_id)
+
+    def _queue(self):
+        return sorted(
+            self._waiting,
+            key=lambda mid: (
+                self._user_load(self._waiting[mid][1]),
+                self._waiting[mid][0],
+            ),
+        )
+
+    def _dispatch(self):
+        while queue := self._queue():
+            head = queue[0]
+            if head != self._head:
+                self._head, self._head_skips = head, 0
+            for mid in queue:
+                if mid != head and self._head_skips >= MAX_HEAD_SKIPS:
+                    return
+                _, user_id, weight, future = self._waiting[mid]
+                if self._running and self._used + weight > self._budget:
+                    continue
+                del self._waiting[mid]
+                if future.done():
+                    break
+                if mid != head:
+                    self._head_skips += 1
+                self._running[mid] = (user_id, weight)
+                self._used += weight
+                future.set_result(None)
+                break
+            else:
+                return
+
+    def position(self, mid):
+        if mid not in self._waiting:
+            return 0
+        return self._queue().index(mid) + 1
+
+    async def acquire(self, listener, weight):
+        future = bot_loop.create_future()
+        self._waiting[listener.mid] = (
+            next(self._seq),
+            listener.user_id,
+            min(weight, self._budget),
+            future,
+        )
+        self._dispatch()
+        try:
+            await future
+        except CancelledError:
+            if self._waiting.pop(listener.mid, None) is None:
+                self.release(listener)
+            raise
+
+    def release(self, listener):
+        if job := self._running.pop(listener.mid, None):
+            self._used -= job[1]
+            self._dispatch()
+
+    @asynccontextmanager
+    async def job(self, listener, weight):
+        await self.acquire(listener, weight)
+        try:
+            yield
+        finally:
+            self.release(listener)
+
+
+media_scheduler = MediaScheduler(max(1, cpu_no))
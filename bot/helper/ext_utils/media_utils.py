@@ -1,8 +1,8 @@
 from contextlib import suppress
 from PIL import Image
-from hashlib import md5
-from aiofiles.os import remove, path as aiopath, makedirs
-import json
+from hashlib import new as new_hash
+from aiofiles.os import remove, path as aiopath, makedirs, stat as aiostat
+from json import loads
 from asyncio import (
     create_subprocess_exec,
     gather,
@@ -10,25 +10,71 @@ from asyncio import (
     sleep,
 )
 from asyncio.subprocess import PIPE
-from os import path as ospath
+from os import path as ospath, stat
 from re import search as re_search, escape
 from time import time
+from zlib import crc32
 from aioshutil import rmtree
 from langcodes import Language
 
-from ... import LOGGER, cpu_no, DOWNLOAD_DIR
+from ... import LOGGER, bot_loop, cpu_no, DOWNLOAD_DIR
 from ...core.config_manager import BinConfig
 from .bot_utils import cmd_exec, sync_to_async
 from .files_utils import get_mime_type, is_archive, is_archive_split
 from .status_utils import time_to_seconds
 
 
-def get_md5_hash(up_path):
-    md5_hash = md5()
-    with open(up_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            md5_hash.update(byte_block)
-        return md5_hash.hexdigest()
+ANALYSIS_CACHE_SIZE = 1000
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+_analysis_cache = {}
+
+
+def _get_analysis(st):
+    key = (st.st_dev, st.st_ino)
+    entry = _analysis_cache.get(key)
+    if entry is None or entry["stamp"] != (st.st_size, st.st_mtime_ns):
+        entry = {"stamp": (st.st_size, st.st_mtime_ns)}
+        _analysis_cache[key] = entry
+        if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            del _analysis_cache[next(iter(_analysis_cache))]
+    return entry
+
+
+async def get_file_analysis(path):
+    try:
+        return _get_analysis(await aiostat(path))
+    except OSError:
+        return {}
+
+
+def get_file_hashes(up_path, *algorithms, offset=0, length=None):
+    algorithms = algorithms or ("md5",)
+    hashes = _get_analysis(stat(up_path)).setdefault(
+        "hashes" if length is None else ("hashes", offset, length), {}
+    )
+    if missing := [algo for algo in algorithms if algo not in hashes]:
+        hashers = {algo: new_hash(algo) for algo in missing if algo != "crc32"}
+        checksum = 0
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(up_path, "rb", buffering=0) as f:
+            f.seek(offset)
+            remaining = length
+            while size := f.readinto(
+                view if remaining is None else view[: min(remaining, len(view))]
+            ):
+                for hasher in hashers.values():
+                    hasher.update(view[:size])
+                if "crc32" in missing:
+                    checksum = crc32(view[:size], checksum)
+                if remaining is not None:
+                    remaining -= size
+        for algo, hasher in hashers.items():
+            hashes[algo] = hasher.hexdigest()
+        if "crc32" in missing:
+            hashes["crc32"] = f"{checksum:08x}"
+    return {algo: hashes[algo] for algo in algorithms}
 
 
 async def create_thumb(msg, _id=""):
@@ -45,7 +91,28 @@ async def create_thumb(msg, _id=""):
     return output
 
 
-async def get_media_info(path, extra_info=False):
+class MediaProbe:
+    def __init__(self, data):
+        self.format = data.get("format") or {}
+        self.streams = data.get("streams") or []
+        self.tags = self.format.get("tags") or {}
+        try:
+            self.duration = round(float(self.format.get("duration", 0)))
+        except ValueError:
+            self.duration = 0
+
+    def get_tag(self, name):
+        return (
+            self.tags.get(name)
+            or self.tags.get(name.upper())
+            or self.tags.get(name.capitalize())
+        )
+
+
+async def get_media_probe(path):
+    analysis = await get_file_analysis(path)
+    if "probe" in analysis:
+        return analysis["probe"]
     try:
         result = await cmd_exec(
             [
@@ -61,43 +128,47 @@ async def get_media_info(path, extra_info=False):
             ]
         )
     except Exception as e:
-        LOGGER.error(f"Get Media Info: {e}. Mostly File not found! - File: {path}")
-        return (0, "", "", "") if extra_info else (0, None, None)
+        LOGGER.error(f"Get Media Probe: {e}. Mostly File not found! - File: {path}")
+        return None
+    probe = None
     if result[0] and result[2] == 0:
-        ffresult = eval(result[0])
-        fields = ffresult.get("format")
-        if fields is None:
-            LOGGER.error(f"get_media_info: {result}")
-            return (0, "", "", "") if extra_info else (0, None, None)
-        duration = round(float(fields.get("duration", 0)))
-        if extra_info:
-            lang, qual, stitles = "", "", ""
-            if (streams := ffresult.get("streams")) and streams[0].get(
-                "codec_type"
-            ) == "video":
-                qual = int(streams[0].get("height"))
-                qual = f"{480 if qual <= 480 else 540 if qual <= 540 else 720 if qual <= 720 else 1080 if qual <= 1080 else 2160 if qual <= 2160 else 4320 if qual <= 4320 else 8640}p"
-                for stream in streams:
-                    if stream.get("codec_type") == "audio" and (
-                        lc := stream.get("tags", {}).get("language")
-                    ):
-                        with suppress(Exception):
-                            lc = Language.get(lc).display_name()
-                        if lc not in lang:
-                            lang += f"{lc}, "
-                    if stream.get("codec_type") == "subtitle" and (
-                        st := stream.get("tags", {}).get("language")
-                    ):
-                        with suppress(Exception):
-                            st = Language.get(st).display_name()
-                        if st not in stitles:
-                            stitles += f"{st}, "
-            return duration, qual, lang[:-2], stitles[:-2]
-        tags = fields.get("tags", {})
-        artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
-        title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
-        return duration, artist, title
-    return (0, "", "", "") if extra_info else (0, None, None)
+        try:
+            probe = MediaProbe(loads(result[0]))
+        except ValueError:
+            LOGGER.error(f"get_media_probe: {result}")
+    elif result[1]:
+        LOGGER.error(f"get_media_probe: {result[1]} - File: {path}")
+    if analysis:
+        analysis["probe"] = probe
+    return probe
+
+
+async def get_media_info(path, extra_info=False):
+    probe = await get_media_probe(path)
+    if probe is None or not probe.format:
+        return (0, "", "", "") if extra_info else (0, None, None)
+    if extra_info:
+        lang, qual, stitles = "", "", ""
+        if (streams := probe.streams) and streams[0].get("codec_type") == "video":
+            qual = int(streams[0].get("height"))
+            qual = f"{480 if qual <= 480 else 540 if qual <= 540 else 720 if qual <= 720 else 1080 if qual <= 1080 else 2160 if qual <= 2160 else 4320 if qual <= 4320 else 8640}p"
+            for stream in streams:
+                if stream.get("codec_type") == "audio" and (
+                    lc := stream.get("tags", {}).get("language")
+                ):
+                    with suppress(Exception):
+                        lc = Language.get(lc).display_name()
+                    if lc not in lang:
+                        lang += f"{lc}, "
+                if stream.get("codec_type") == "subtitle" and (
+                    st := stream.get("tags", {}).get("language")
+                ):
+                    with suppress(Exception):
+                        st = Language.get(st).display_name()
+                    if st not in stitles:
+                        stitles += f"{st}, "
+        return probe.duration, qual, lang[:-2], stitles[:-2]
+    return probe.duration, probe.get_tag("artist"), probe.get_tag("title")
 
 
 async def get_document_type(path):
@@ -111,81 +182,27 @@ async def get_document_type(path):
     mime_type = await sync_to_async(get_mime_type, path)
     if mime_type.startswith("image"):
         return False, False, True
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_streams",
-                path,
-            ]
-        )
-        if result[1] and mime_type.startswith("video"):
-            is_video = True
-    except Exception as e:
-        LOGGER.error(f"Get Document Type: {e}. Mostly File not found! - File: {path}")
+    probe = await get_media_probe(path)
+    if probe is None:
         if mime_type.startswith("audio"):
             return False, True, False
-        if not mime_type.startswith("video") and not mime_type.endswith("octet-stream"):
-            return is_video, is_audio, is_image
-        if mime_type.startswith("video"):
-            is_video = True
-        return is_video, is_audio, is_image
-    if result[0] and result[2] == 0:
-        fields = eval(result[0]).get("streams")
-        if fields is None:
-            LOGGER.error(f"get_document_type: {result}")
-            return is_video, is_audio, is_image
-        is_video = False
-        for stream in fields:
-            if stream.get("codec_type") == "video":
-                codec_name = stream.get("codec_name", "").lower()
-                if codec_name not in {"mjpeg", "png", "bmp"}:
-                    is_video = True
-            elif stream.get("codec_type") == "audio":
-                is_audio = True
+        return mime_type.startswith("video"), is_audio, is_image
+    for stream in probe.streams:
+        if stream.get("codec_type") == "video":
+            codec_name = stream.get("codec_name", "").lower()
+            if codec_name not in {"mjpeg", "png", "bmp"}:
+                is_video = True
+        elif stream.get("codec_type") == "audio":
+            is_audio = True
     return is_video, is_audio, is_image
 
 
 async def get_streams(file):
-    """
-    Gets media stream information using ffprobe.
-
-    Args:
-        file: Path to the media file.
-
-    Returns:
-        A list of stream objects (dictionaries) or None if an error occurs
-        or no streams are found.
-    """
-    cmd = [
-        "ffprobe",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-print_format",
-        "json",
-        "-show_streams",
-        file,
-    ]
-    process = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-    stdout, stderr = await process.communicate()
-
-    if process.returncode != 0:
-        LOGGER.error(f"Error getting stream info: {stderr.decode().strip()}")
-        return None
-
-    try:
-        return json.loads(stdout)["streams"]
-    except KeyError:
-        LOGGER.error(
-            f"No streams found in the ffprobe output: {stdout.decode().strip()}",
-        )
+    probe = await get_media_probe(file)
+    if probe is None or not probe.streams:
+        LOGGER.error(f"No streams found in the ffprobe output - File: {file}")
         return None
+    return probe.streams
 
 
 async def take_ss(video_file, ss_nb) -> bool:
@@ -376,6 +393,7 @@ class FFMpeg:
         self._eta_raw = 0
         self._time_rate = 0.1
         self._start_time = 0
+        self._out_time = 0
 
     @property
     def processed_bytes(self):
@@ -428,8 +446,9 @@ class FFMpeg:
                     elif key == "speed":
                         self._time_rate = max(0.1, float(value.strip("x")))
                     elif key == "out_time":
+                        self._out_time = time_to_seconds(value)
                         self._processed_time = (
-                            time_to_seconds(value) + self._last_processed_time
+                            self._out_time + self._last_processed_time
                         )
                         try:
                             self._progress_raw = (
@@ -717,12 +736,194 @@ class FFMpeg:
                 await remove(output_file)
             return False
 
-    async def split(self, f_path, file_, parts, split_size):
-        self.clear()
+    async def _get_keyframes(self, f_path):
+        try:
+            stdout, _, code = await cmd_exec(
+                [
+                    "ffprobe",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-select_streams",
+                    "v:0",
+                    "-show_entries",
+                    "packet=pts_time,pos,flags:format=start_time",
+                    "-of",
+                    "compact=p=0",
+                    f_path,
+                ]
+            )
+        except Exception as e:
+            LOGGER.error(f"Get Keyframes: {e}. Path: {f_path}")
+            return []
+        if code != 0:
+            return []
+        keyframes = []
+        start_time = 0
+        for line in stdout.splitlines():
+            packet = dict(field.partition("=")[::2] for field in line.split("|"))
+            if "start_time" in packet:
+                with suppress(ValueError):
+                    start_time = float(packet["start_time"])
+                continue
+            if not packet.get("flags", "").startswith("K"):
+                continue
+            try:
+                keyframes.append((float(packet["pts_time"]), int(packet["pos"])))
+            except (KeyError, ValueError):
+                continue
+        return [(key_time - start_time, pos) for key_time, pos in keyframes]
+
+    @staticmethod
+    def _get_cut_points(keyframes, split_size):
+        cuts = []
+        start_pos = 0
+        last_time, last_pos = keyframes[0]
+        for key_time, pos in keyframes:
+            if pos - start_pos > split_size and last_pos > start_pos:
+                cuts.append(last_time)
+                start_pos = last_pos
+            last_time, last_pos = key_time, pos
+        return cuts
+
+    async def _emit_parts(self, pattern, emitted, on_part, finished):
+        while await aiopath.exists(out_path := pattern % (len(emitted) + 1)):
+            if not finished and not await aiopath.exists(pattern % (len(emitted) + 2)):
+                break
+            if await aiopath.getsize(out_path) > self._listener.max_split_size:
+                if not emitted:
+                    break
+                self._listener.split_files[ospath.normpath(out_path)] = (
+                    self._listener.split_size
+                )
+            emitted.append(out_path)
+            on_part(out_path)
+
+    async def _watch_parts(self, pattern, emitted, on_part):
+        while True:
+            await sleep(1)
+            await self._emit_parts(pattern, emitted, on_part, False)
+
+    async def _segment_split(self, f_path, file_, split_size, on_part=None):
+        if not (keyframes := await self._get_keyframes(f_path)):
+            return None
+        base_name, extension = ospath.splitext(file_)
+        pattern = ospath.join(
+            ospath.dirname(f_path),
+            f"{base_name.replace('%', '%%')}.part%03d{extension.replace('%', '%%')}",
+        )
         multi_streams = True
+        emitted = []
+        for _ in range(3):
+            if not (cuts := self._get_cut_points(keyframes, split_size)):
+                return None
+            cmd = [
+                BinConfig.FFMPEG_NAME,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-progress",
+                "pipe:1",
+                "-i",
+                f_path,
+                "-map",
+                "0",
+                "-map_chapters",
+                "-1",
+                "-strict",
+                "-2",
+                "-c",
+                "copy",
+                "-f",
+                "segment",
+                "-segment_times",
+                ",".join(f"{max(cut - 0.001, 0):.6f}" for cut in cuts),
+                "-segment_start_number",
+                "1",
+                "-reset_timestamps",
+                "1",
+                "-threads",
+                f"{max(1, cpu_no // 2)}",
+                pattern,
+            ]
+            if not multi_streams:
+                del cmd[8:10]
+            if self._listener.is_cancelled:
+                return False
+            self._listener.subproc = await create_subprocess_exec(
+                *cmd, stdout=PIPE, stderr=PIPE
+            )
+            watcher = (
+                bot_loop.create_task(self._watch_parts(pattern, emitted, on_part))
+                if on_part
+                else None
+            )
+            await self._ffmpeg_progress()
+            if self._listener.is_cancelled:
+                with suppress(Exception):
+                    self._listener.subproc.kill()
+            _, stderr = await self._listener.subproc.communicate()
+            code = self._listener.subproc.returncode
+            if watcher:
+                watcher.cancel()
+            if self._listener.is_cancelled:
+                return False
+            if code == -9:
+                self._listener.is_cancelled = True
+                return False
+            if code == 0 and on_part:
+                await self._emit_parts(pattern, emitted, on_part, True)
+            if emitted:
+                if code != 0:
+                    LOGGER.error(
+                        f"{stderr.decode(errors='ignore').strip()}. Split stopped after {len(emitted)} parts. Path: {f_path}"
+                    )
+                return code == 0
+            outputs = []
+            while await aiopath.exists(out_path := pattern % (len(outputs) + 1)):
+                outputs.append(out_path)
+            if code != 0:
+                try:
+                    stderr = stderr.decode().strip()
+                except Exception:
+                    stderr = "Unable to decode the error!"
+                for out_path in outputs:
+                    with suppress(Exception):
+                        await remove(out_path)
+                if multi_streams:
+                    LOGGER.warning(
+                        f"{stderr}. Retrying without map, -map 0 not working in all situations. Path: {f_path}"
+                    )
+                    multi_streams = False
+                    continue
+                LOGGER.warning(
+                    f"{stderr}. Unable to split this video, if it's size less than {self._listener.max_split_size} will be uploaded as it is. Path: {f_path}"
+                )
+                return False
+            if not outputs:
+                return None
+            out_size = max([await aiopath.getsize(out) for out in outputs])
+            if out_size <= self._listener.max_split_size:
+                return True
+            split_size -= (out_size - self._listener.max_split_size) + 5000000
+            LOGGER.warning(
+                f"Part size is {out_size}. Trying again with lower split size!. Path: {f_path}"
+            )
+            for out_path in outputs:
+                await remove(out_path)
+            self.clear()
+        return None
+
+    async def split(self, f_path, file_, parts, split_size, on_part=None):
+        self.clear()
         self._total_time = duration = (await get_media_info(f_path))[0]
-        base_name, extension = ospath.splitext(file_)
         split_size -= 3000000
+        res = await self._segment_split(f_path, file_, split_size, on_part)
+        if res is not None:
+            return res
+        self.clear()
+        multi_streams = True
+        base_name, extension = ospath.splitext(file_)
         start_time = 0
         i = 1
         while i <= parts or start_time < duration - 4:
@@ -759,11 +960,12 @@ class FFMpeg:
                 del cmd[12]
             if self._listener.is_cancelled:
                 return False
+            self._out_time = 0
             self._listener.subproc = await create_subprocess_exec(
                 *cmd, stdout=PIPE, stderr=PIPE
             )
             await self._ffmpeg_progress()
-            _, stderr = await self._listener.subproc.communicate()
+            stdout, stderr = await self._listener.subproc.communicate()
             code = self._listener.subproc.returncode
             if self._listener.is_cancelled:
                 return False
@@ -796,20 +998,30 @@ class FFMpeg:
                 )
                 await remove(out_path)
                 continue
-            lpd = (await get_media_info(out_path))[0]
+            for line in stdout.decode(errors="ignore").splitlines():
+                key, _, value = line.partition("=")
+                if key == "out_time" and value != "N/A":
+                    self._out_time = time_to_seconds(value)
+            lpd = round(self._out_time) or (await get_media_info(out_path))[0]
             if lpd == 0:
                 LOGGER.error(
                     f"Something went wrong while splitting, mostly file is corrupted. Path: {f_path}"
                 )
+                if on_part:
+                    on_part(out_path)
                 break
-            elif duration == lpd:
+            elif duration - lpd <= 1:
                 LOGGER.warning(
                     f"This file has been splitted with default stream and audio, so you will only see one part with less size from orginal one because it doesn't have all streams and audios. This happens mostly with MKV videos. Path: {f_path}"
                 )
+                if on_part:
+                    on_part(out_path)
                 break
             elif lpd <= 3:
                 await remove(out_path)
                 break
+            if on_part:
+                on_part(out_path)
             self._last_processed_time += lpd
             self._last_processed_bytes += out_size
             start_time += lpd - 3
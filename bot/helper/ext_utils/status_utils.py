@@ -16,8 +16,14 @@ from ... import (
 from ...core.config_manager import Config
 from ..telegram_helper.bot_commands import BotCommands
 from ..telegram_helper.button_build import ButtonMaker
+from .media_scheduler import media_scheduler
 
 SIZE_UNITS = ["B", "KB", "MB", "GB", "TB", "PB"]
+STATS_MARKER = "\n┟ <b>CPU</b> → "
+STATS_REFRESH_INTERVAL = 60
+
+_row_cache = {}
+_stats_cache = {"time": 0, "text": ""}
 
 
 class MirrorStatus:
@@ -79,25 +85,24 @@ STATUSES = {
 
 async def get_task_by_gid(gid: str):
     async with task_dict_lock:
-        for tk in task_dict.values():
-            if hasattr(tk, "seeding"):
-                await tk.update()
-            if tk.gid() == gid:
-                return tk
+        if tk := task_dict.by_gid(gid):
+            return tk
+        task_dict.reindex_gids()
+        if tk := task_dict.by_gid(gid):
+            return tk
+        torrent_tasks = [tk for tk in task_dict.values() if hasattr(tk, "seeding")]
+    if not torrent_tasks:
         return None
+    await gather(*(tk.update() for tk in torrent_tasks), return_exceptions=True)
+    async with task_dict_lock:
+        task_dict.reindex_gids()
+        return task_dict.by_gid(gid)
 
 
 async def get_specific_tasks(status, user_id):
+    tasks_to_check = task_dict.by_user(user_id) if user_id else list(task_dict.values())
     if status == "All":
-        if user_id:
-            return [tk for tk in task_dict.values() if tk.listener.user_id == user_id]
-        else:
-            return list(task_dict.values())
-    tasks_to_check = (
-        [tk for tk in task_dict.values() if tk.listener.user_id == user_id]
-        if user_id
-        else list(task_dict.values())
-    )
+        return tasks_to_check
     coro_tasks = []
     coro_tasks.extend(tk for tk in tasks_to_check if iscoroutinefunction(tk.status))
     coro_statuses = await gather(*[tk.status() for tk in coro_tasks])
@@ -200,11 +205,82 @@ def get_progress_bar_string(pct):
     return f"[{p_str}]"
 
 
+def _get_static_row(task):
+    key = (task.name(), task.listener.subname, task.gid())
+    cached = _row_cache.get(task.listener.mid)
+    if cached and cached[0] is task and cached[1] == key:
+        return cached[2]
+    head = f"<b><i>{escape(f'{task.name()}')}</i></b>"
+    if task.listener.subname:
+        head += f"\n┖ <b>Sub Name</b> → <i>{task.listener.subname}</i>"
+    head += f"\n\n<b>Task By {task.listener.message.from_user.mention(style='html')} </b> ( #ID{task.listener.message.from_user.id} )"
+    if task.listener.is_super_chat:
+        head += f" <i>[<a href='{task.listener.message.link}'>Link</a>]</i>"
+    tail = f"\n┠ <b>Engine</b> → <i>{task.engine}</i>"
+    tail += f"\n┠ <b>In Mode</b> → <i>{task.listener.mode[0]}</i>"
+    tail += f"\n┠ <b>Out Mode</b> → <i>{task.listener.mode[1]}</i>"
+    # TODO: Add Bt Sel
+    tail += (
+        f"\n<b>┖ Stop</b> → <i>/{BotCommands.CancelTaskCommand[1]}_{task.gid()}</i>\n\n"
+    )
+    _row_cache[task.listener.mid] = (task, key, (head, tail))
+    return head, tail
+
+
+def _get_task_row(task, tstatus):
+    head, tail = _get_static_row(task)
+    msg = head
+    elapsed = time() - task.listener.message.date.timestamp()
+
+    if (
+        tstatus not in [MirrorStatus.STATUS_SEED, MirrorStatus.STATUS_QUEUEUP]
+        and task.listener.progress
+    ):
+        progress = task.progress()
+        msg += f"\n┟ {get_progress_bar_string(progress)} <i>{progress}</i>"
+        if task.listener.subname:
+            subsize = f" / {get_readable_file_size(task.listener.subsize)}"
+            ac = len(task.listener.files_to_proceed)
+            count = f"( {task.listener.proceed_count} / {ac or '?'} )"
+        else:
+            subsize = ""
+            count = ""
+        msg += f"\n┠ <b>Processed</b> → <i>{task.processed_bytes()}{subsize} of {task.size()}</i>"
+        if count:
+            msg += f"\n┠ <b>Count:</b> → <b>{count}</b>"
+        msg += f"\n┠ <b>Status</b> → <b>{tstatus}</b>"
+        msg += f"\n┠ <b>Speed</b> → <i>{task.speed()}</i>"
+        eta = task.eta()
+        msg += f"\n┠ <b>Time</b> → <i>{eta} of {get_readable_time(elapsed + get_raw_time(eta))} ( {get_readable_time(elapsed)} )</i>"
+        if tstatus == MirrorStatus.STATUS_DOWNLOAD and (
+            task.listener.is_torrent or task.listener.is_qbit
+        ):
+            try:
+                msg += f"\n┠ <b>Seeders</b> → {task.seeders_num()} | <b>Leechers</b> → {task.leechers_num()}"
+            except Exception:
+                pass
+        # TODO: Add Connected Peers
+    elif tstatus == MirrorStatus.STATUS_SEED:
+        msg += f"\n┠ <b>Size</b> → <i>{task.size()}</i> | <b>Uploaded</b>  → <i>{task.uploaded_bytes()}</i>"
+        msg += f"\n┠ <b>Status</b> → <b>{tstatus}</b>"
+        msg += f"\n┠ <b>Speed</b> → <i>{task.seed_speed()}</i>"
+        msg += f"\n┠ <b>Ratio</b> → <i>{task.ratio()}</i>"
+        msg += f"\n┠ <b>Time</b> → <i>{task.seeding_time()}</i> | <b>Elapsed</b> → <i>{get_readable_time(elapsed)}</i>"
+    else:
+        msg += f"\n┠ <b>Size</b> → <i>{task.size()}</i>"
+        if position := media_scheduler.position(task.listener.mid):
+            msg += f"\n┠ <b>Media Queue</b> → <i>#{position}</i>"
+    return msg + tail
+
+
 async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=1):
     msg = ""
     button = None
 
     tasks = await get_specific_tasks(status, sid if is_user else None)
+    for mid in list(_row_cache):
+        if mid not in task_dict:
+            del _row_cache[mid]
 
     STATUS_LIMIT = Config.STATUS_LIMIT
     tasks_no = len(tasks)
@@ -226,56 +302,7 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
             tstatus = await task.status()
         else:
             tstatus = task.status()
-        msg += f"<b>{index + start_position}.</b> "
-        msg += f"<b><i>{escape(f'{task.name()}')}</i></b>"
-        if task.listener.subname:
-            msg += f"\n┖ <b>Sub Name</b> → <i>{task.listener.subname}</i>"
-        elapsed = time() - task.listener.message.date.timestamp()
-
-        msg += f"\n\n<b>Task By {task.listener.message.from_user.mention(style='html')} </b> ( #ID{task.listener.message.from_user.id} )"
-        if task.listener.is_super_chat:
-            msg += f" <i>[<a href='{task.listener.message.link}'>Link</a>]</i>"
-
-        if (
-            tstatus not in [MirrorStatus.STATUS_SEED, MirrorStatus.STATUS_QUEUEUP]
-            and task.listener.progress
-        ):
-            progress = task.progress()
-            msg += f"\n┟ {get_progress_bar_string(progress)} <i>{progress}</i>"
-            if task.listener.subname:
-                subsize = f" / {get_readable_file_size(task.listener.subsize)}"
-                ac = len(task.listener.files_to_proceed)
-                count = f"( {task.listener.proceed_count} / {ac or '?'} )"
-            else:
-                subsize = ""
-                count = ""
-            msg += f"\n┠ <b>Processed</b> → <i>{task.processed_bytes()}{subsize} of {task.size()}</i>"
-            if count:
-                msg += f"\n┠ <b>Count:</b> → <b>{count}</b>"
-            msg += f"\n┠ <b>Status</b> → <b>{tstatus}</b>"
-            msg += f"\n┠ <b>Speed</b> → <i>{task.speed()}</i>"
-            msg += f"\n┠ <b>Time</b> → <i>{task.eta()} of {get_readable_time(elapsed + get_raw_time(task.eta()))} ( {get_readable_time(elapsed)} )</i>"
-            if tstatus == MirrorStatus.STATUS_DOWNLOAD and (
-                task.listener.is_torrent or task.listener.is_qbit
-            ):
-                try:
-                    msg += f"\n┠ <b>Seeders</b> → {task.seeders_num()} | <b>Leechers</b> → {task.leechers_num()}"
-                except Exception:
-                    pass
-            # TODO: Add Connected Peers
-        elif tstatus == MirrorStatus.STATUS_SEED:
-            msg += f"\n┠ <b>Size</b> → <i>{task.size()}</i> | <b>Uploaded</b>  → <i>{task.uploaded_bytes()}</i>"
-            msg += f"\n┠ <b>Status</b> → <b>{tstatus}</b>"
-            msg += f"\n┠ <b>Speed</b> → <i>{task.seed_speed()}</i>"
-            msg += f"\n┠ <b>Ratio</b> → <i>{task.ratio()}</i>"
-            msg += f"\n┠ <b>Time</b> → <i>{task.seeding_time()}</i> | <b>Elapsed</b> → <i>{get_readable_time(elapsed)}</i>"
-        else:
-            msg += f"\n┠ <b>Size</b> → <i>{task.size()}</i>"
-        msg += f"\n┠ <b>Engine</b> → <i>{task.engine}</i>"
-        msg += f"\n┠ <b>In Mode</b> → <i>{task.listener.mode[0]}</i>"
-        msg += f"\n┠ <b>Out Mode</b> → <i>{task.listener.mode[1]}</i>"
-        # TODO: Add Bt Sel
-        msg += f"\n<b>┖ Stop</b> → <i>/{BotCommands.CancelTaskCommand[1]}_{task.gid()}</i>\n\n"
+        msg += f"<b>{index + start_position}.</b> {_get_task_row(task, tstatus)}"
 
     if len(msg) == 0:
         if status == "All":
@@ -300,6 +327,18 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
                 buttons.data_button(label, f"status {sid} st {status_value}")
     buttons.data_button("♻️ Refresh", f"status {sid} ref", position="header")
     button = buttons.build_menu(8)
-    msg += f"\n┟ <b>CPU</b> → {cpu_percent()}% | <b>F</b> → {get_readable_file_size(disk_usage(DOWNLOAD_DIR).free)} [{round(100 - disk_usage(DOWNLOAD_DIR).percent, 1)}%]"
-    msg += f"\n┖ <b>RAM</b> → {virtual_memory().percent}% | <b>UP</b> → {get_readable_time(time() - bot_start_time)}"
+    msg += _get_bot_stats()
     return msg, button
+
+
+def _get_bot_stats():
+    if time() - _stats_cache["time"] >= 1:
+        disk = disk_usage(DOWNLOAD_DIR)
+        text = f"{STATS_MARKER}{cpu_percent()}% | <b>F</b> → {get_readable_file_size(disk.free)} [{round(100 - disk.percent, 1)}%]"
+        text += f"\n┖ <b>RAM</b> → {virtual_memory().percent}% | <b>UP</b> → {get_readable_time(time() - bot_start_time)}"
+        _stats_cache.update({"time": time(), "text": text})
+    return _stats_cache["text"]
+
+
+def get_status_hash(msg, button):
+    return hash((msg.rsplit(STATS_MARKER, 1)[0], str(button)))
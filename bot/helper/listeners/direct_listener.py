@@ -1,9 +1,12 @@
-from asyncio import sleep, TimeoutError
+from asyncio import sleep, TimeoutError, gather
 from aiohttp.client_exceptions import ClientError
+from contextlib import suppress
 
 from ... import LOGGER
 from ...core.torrent_manager import TorrentManager, aria2_name
 
+MAX_ACTIVE_DOWNLOADS = 10
+
 
 class DirectListener:
     def __init__(self, path, listener, a2c_opt):
@@ -12,65 +15,92 @@ class DirectListener:
         self._a2c_opt = a2c_opt
         self._proc_bytes = 0
         self._failed = 0
-        self.download_task = None
+        self._downloads = {}
         self.name = self.listener.name
 
+    @property
+    def download_task(self):
+        return next(iter(self._downloads.values()), None)
+
     @property
     def processed_bytes(self):
-        if self.download_task:
-            return self._proc_bytes + int(
-                self.download_task.get("completedLength", "0")
-            )
-        return self._proc_bytes
+        return self._proc_bytes + sum(
+            int(download.get("completedLength", "0"))
+            for download in self._downloads.values()
+        )
 
     @property
     def speed(self):
-        return (
-            int(self.download_task.get("downloadSpeed", "0"))
-            if self.download_task
-            else 0
+        return sum(
+            int(download.get("downloadSpeed", "0"))
+            for download in self._downloads.values()
+        )
+
+    async def _add_download(self, content):
+        options = self._a2c_opt.copy()
+        if content["path"]:
+            options["dir"] = f"{self._path}/{content['path']}"
+        else:
+            options["dir"] = self._path
+        filename = content["filename"]
+        options["out"] = filename
+        try:
+            gid = await TorrentManager.aria2.addUri(
+                uris=[content["url"]], options=options, position=0
+            )
+        except (TimeoutError, ClientError, Exception) as e:
+            self._failed += 1
+            LOGGER.error(f"Unable to download {filename} due to: {e}")
+            return
+        self._downloads[gid] = {"gid": gid, "status": "waiting"}
+
+    async def _update_downloads(self):
+        gids = list(self._downloads)
+        results = await gather(
+            *(TorrentManager.aria2.tellStatus(gid) for gid in gids),
+            return_exceptions=True,
         )
+        for gid, download in zip(gids, results):
+            if gid not in self._downloads:
+                continue
+            if isinstance(download, Exception):
+                self._failed += 1
+                del self._downloads[gid]
+                LOGGER.error(f"Unable to get status of {gid} due to: {download}")
+            elif error_message := download.get("errorMessage"):
+                self._failed += 1
+                del self._downloads[gid]
+                LOGGER.error(
+                    f"Unable to download {aria2_name(download)} due to: {error_message}"
+                )
+                await TorrentManager.aria2_remove(download)
+            elif download.get("status", "") == "complete":
+                self._proc_bytes += int(download.get("totalLength", "0"))
+                del self._downloads[gid]
+                await TorrentManager.aria2_remove(download)
+            else:
+                self._downloads[gid] = download
+
+    async def _remove_downloads(self):
+        downloads = list(self._downloads.values())
+        self._downloads.clear()
+        for download in downloads:
+            with suppress(Exception):
+                await TorrentManager.aria2_remove(download)
 
     async def download(self, contents):
         self.is_downloading = True
-        for content in contents:
-            if self.listener.is_cancelled:
+        index = 0
+        while not self.listener.is_cancelled:
+            while len(self._downloads) < MAX_ACTIVE_DOWNLOADS and index < len(contents):
+                await self._add_download(contents[index])
+                index += 1
+            if not self._downloads:
                 break
-            if content["path"]:
-                self._a2c_opt["dir"] = f"{self._path}/{content['path']}"
-            else:
-                self._a2c_opt["dir"] = self._path
-            filename = content["filename"]
-            self._a2c_opt["out"] = filename
-            try:
-                gid = await TorrentManager.aria2.addUri(
-                    uris=[content["url"]], options=self._a2c_opt, position=0
-                )
-            except (TimeoutError, ClientError, Exception) as e:
-                self._failed += 1
-                LOGGER.error(f"Unable to download {filename} due to: {e}")
-                continue
-            self.download_task = await TorrentManager.aria2.tellStatus(gid)
-            while True:
-                if self.listener.is_cancelled:
-                    if self.download_task:
-                        await TorrentManager.aria2_remove(self.download_task)
-                    break
-                self.download_task = await TorrentManager.aria2.tellStatus(gid)
-                if error_message := self.download_task.get("errorMessage"):
-                    self._failed += 1
-                    LOGGER.error(
-                        f"Unable to download {aria2_name(self.download_task)} due to: {error_message}"
-                    )
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                elif self.download_task.get("status", "") == "complete":
-                    self._proc_bytes += int(self.download_task.get("totalLength", "0"))
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                await sleep(1)
-            self.download_task = None
+            await sleep(1)
+            await self._update_downloads()
         if self.listener.is_cancelled:
+            await self._remove_downloads()
             return
         if self._failed == len(contents):
             await self.listener.on_download_error("All files are failed to download!")
@@ -82,5 +112,4 @@ class DirectListener:
         self.listener.is_cancelled = True
         LOGGER.info(f"Cancelling Download: {self.listener.name}")
         await self.listener.on_download_error("Download Cancelled by User!")
-        if self.download_task:
-            await TorrentManager.aria2_remove(self.download_task)
+        await self._remove_downloads()
@@ -2,6 +2,7 @@ from aiofiles.os import remove, path as aiopath
 from asyncio import sleep, TimeoutError
 from time import time
 from aiohttp.client_exceptions import ClientError
+from aioqbt.api.types import TorrentInfo
 from aioqbt.exc import AQError
 
 from ... import (
@@ -21,6 +22,8 @@ from ..ext_utils.task_manager import stop_duplicate_check, limit_checker
 from ..mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
 from ..telegram_helper.message_utils import update_status_message
 
+_RECHECK_STATES = ("metaDL", "stalledDL", "stoppedUP", "stoppedDL")
+
 
 async def _remove_torrent(hash_, tag):
     await TorrentManager.qbittorrent.torrents.delete([hash_], True)
@@ -46,7 +49,7 @@ async def _on_seed_finish(tor):
     ext_hash = tor.hash
     LOGGER.info(f"Cancelling Seed: {tor.name}")
     if task := await get_task_by_gid(ext_hash[:12]):
-        msg = f"Seeding stopped with Ratio: {round(tor.ratio, 3)} and Time: {get_readable_time(int(tor.seeding_time.total_seconds() or "0"))}"
+        msg = f"Seeding stopped with Ratio: {round(tor.ratio, 3)} and Time: {get_readable_time(int(tor.seeding_time.total_seconds() or '0'))}"
         await task.listener.on_upload_error(msg)
     await _remove_torrent(ext_hash, tor.tags[0])
 
@@ -117,92 +120,107 @@ async def _on_download_complete(tor):
         await _remove_torrent(ext_hash, tag)
 
 
+async def _process_torrent(tor_info):
+    tag = tor_info.tags[0]
+    state = tor_info.state
+    if state == "metaDL":
+        qb_torrents[tag]["stalled_time"] = time()
+        if (
+            Config.TORRENT_TIMEOUT
+            and time() - qb_torrents[tag]["start_time"] >= Config.TORRENT_TIMEOUT
+        ):
+            await _on_download_error("Dead Torrent!", tor_info)
+        else:
+            await TorrentManager.qbittorrent.torrents.reannounce([tor_info.hash])
+    elif state == "downloading":
+        qb_torrents[tag]["stalled_time"] = time()
+        if not qb_torrents[tag]["stop_dup_check"]:
+            qb_torrents[tag]["stop_dup_check"] = True
+            await _stop_duplicate(tor_info)
+        if not qb_torrents[tag]["size_check"]:
+            qb_torrents[tag]["size_check"] = True
+            await _size_check(tor_info)
+    elif state == "stalledDL":
+        if (
+            not qb_torrents[tag]["rechecked"]
+            and 0.99989999999999999 < tor_info.progress < 1
+        ):
+            msg = f"Force recheck - Name: {tor_info.name} Hash: "
+            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
+            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
+            LOGGER.warning(msg)
+            await TorrentManager.qbittorrent.torrents.recheck([tor_info.hash])
+            qb_torrents[tag]["rechecked"] = True
+        elif (
+            Config.TORRENT_TIMEOUT
+            and time() - qb_torrents[tag]["stalled_time"] >= Config.TORRENT_TIMEOUT
+        ):
+            await _on_download_error("Dead Torrent!", tor_info)
+        else:
+            await TorrentManager.qbittorrent.torrents.reannounce([tor_info.hash])
+    elif state == "missingFiles":
+        await TorrentManager.qbittorrent.torrents.recheck([tor_info.hash])
+    elif state == "error":
+        await _on_download_error("No enough space for this torrent on device", tor_info)
+    elif (
+        int(tor_info.completion_on.timestamp()) != -1
+        and not qb_torrents[tag]["uploaded"]
+        and state
+        in [
+            "queuedUP",
+            "stalledUP",
+            "uploading",
+            "forcedUP",
+        ]
+    ):
+        qb_torrents[tag]["uploaded"] = True
+        await _on_download_complete(tor_info)
+    elif state in ["stoppedUP", "stoppedDL"] and qb_torrents[tag]["seeding"]:
+        qb_torrents[tag]["seeding"] = False
+        await _on_seed_finish(tor_info)
+        await sleep(0.5)
+
+
 @new_task
 async def _qb_listener():
+    rid = 0
+    torrents = {}
+    seen = {}
     while True:
         async with qb_listener_lock:
             try:
-                torrents = await TorrentManager.qbittorrent.torrents.info()
+                data = await TorrentManager.qbittorrent.sync.maindata(rid)
+                rid = data.rid
+                if data.full_update:
+                    torrents = {}
+                    seen.clear()
+                for hash_ in data.torrents_removed:
+                    torrents.pop(hash_, None)
+                    seen.pop(hash_, None)
+                for hash_, delta in data.torrents.items():
+                    torrents.setdefault(hash_, {"hash": hash_}).update(delta)
                 if len(torrents) == 0:
                     intervals["qb"] = ""
                     break
-                for tor_info in torrents:
-                    tag = tor_info.tags[0]
+                for hash_, raw_info in torrents.items():
+                    tag = raw_info.get("tags", "").split(",", 1)[0].strip()
                     if tag not in qb_torrents:
                         continue
-                    state = tor_info.state
-                    if state == "metaDL":
-                        qb_torrents[tag]["stalled_time"] = time()
-                        if (
-                            Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["start_time"]
-                            >= Config.TORRENT_TIMEOUT
-                        ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash]
-                            )
-                    elif state == "downloading":
-                        qb_torrents[tag]["stalled_time"] = time()
-                        if not qb_torrents[tag]["stop_dup_check"]:
-                            qb_torrents[tag]["stop_dup_check"] = True
-                            await _stop_duplicate(tor_info)
-                        if not qb_torrents[tag]["size_check"]:
-                            qb_torrents[tag]["size_check"] = True
-                            await _size_check(tor_info)
-                    elif state == "stalledDL":
-                        if (
-                            not qb_torrents[tag]["rechecked"]
-                            and 0.99989999999999999 < tor_info.progress < 1
-                        ):
-                            msg = f"Force recheck - Name: {tor_info.name} Hash: "
-                            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
-                            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
-                            LOGGER.warning(msg)
-                            await TorrentManager.qbittorrent.torrents.recheck(
-                                [tor_info.hash]
-                            )
-                            qb_torrents[tag]["rechecked"] = True
-                        elif (
-                            Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["stalled_time"]
-                            >= Config.TORRENT_TIMEOUT
-                        ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash]
-                            )
-                    elif state == "missingFiles":
-                        await TorrentManager.qbittorrent.torrents.recheck(
-                            [tor_info.hash]
-                        )
-                    elif state == "error":
-                        await _on_download_error(
-                            "No enough space for this torrent on device", tor_info
-                        )
-                    elif (
-                        int(tor_info.completion_on.timestamp()) != -1
-                        and not qb_torrents[tag]["uploaded"]
-                        and state
-                        in [
-                            "queuedUP",
-                            "stalledUP",
-                            "uploading",
-                            "forcedUP",
-                        ]
-                    ):
-                        qb_torrents[tag]["uploaded"] = True
-                        await _on_download_complete(tor_info)
-                    elif (
-                        state in ["stoppedUP", "stoppedDL"]
-                        and qb_torrents[tag]["seeding"]
+                    flags = tuple(
+                        v for v in qb_torrents[tag].values() if isinstance(v, bool)
+                    )
+                    if (
+                        seen.get(hash_) == flags
+                        and hash_ not in data.torrents
+                        and raw_info.get("state") not in _RECHECK_STATES
                     ):
-                        qb_torrents[tag]["seeding"] = False
-                        await _on_seed_finish(tor_info)
-                        await sleep(0.5)
+                        continue
+                    seen[hash_] = flags
+                    await _process_torrent(
+                        TorrentManager.qbittorrent._create_object(TorrentInfo, raw_info)
+                    )
             except (ClientError, TimeoutError, Exception, AQError) as e:
+                rid = 0
                 LOGGER.error(str(e))
         await sleep(3)
 
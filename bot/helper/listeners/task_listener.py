@@ -315,7 +315,8 @@ class TaskListener(TaskConfig):
                 return
             self.clear()
 
-        self.subproc = None
+        if not self.split_queues:
+            self.subproc = None
 
         add_to_queue, event = await check_running_tasks(self, "up")
         await start_from_queued()
@@ -328,7 +329,8 @@ class TaskListener(TaskConfig):
                 return
             LOGGER.info(f"Start from Queued/Upload: {self.name}")
 
-        self.size = await get_path_size(up_dir)
+        if not self.split_queues:
+            self.size = await get_path_size(up_dir)
 
         if self.is_yt:
             LOGGER.info(f"Up to yt Name: {self.name}")
@@ -1,13 +1,17 @@
 from cloudscraper import create_scraper
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from hashlib import sha256
 from http.cookiejar import MozillaCookieJar
 from json import loads
 from lxml.etree import HTML
 from os import path as ospath
-from re import findall, match, search
+from re import I, compile, findall, match, search
 from requests import Session, post, get, RequestException
 from requests.adapters import HTTPAdapter
-from time import sleep
+from threading import Lock
+from time import sleep, time
 from urllib.parse import parse_qs, urlparse, quote
 from urllib3.util.retry import Retry
 from uuid import uuid4
@@ -23,6 +27,39 @@ user_agent = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0"
 )
 
+
+class _SharedAdapter(HTTPAdapter):
+    def close(self):
+        pass
+
+
+_http_adapter = _SharedAdapter(pool_connections=32, pool_maxsize=32)
+_resolver_pool = ThreadPoolExecutor(max_workers=16)
+
+RESOLVE_CACHE_SIZE = 256
+RESOLVE_CACHE_TTL = 600
+NEGATIVE_CACHE_TTL = 60
+_resolve_cache_ttls = {
+    "mediafire.com": 300,
+    "gofile.io": 1800,
+    "pixeldrain.com": 3600,
+}
+_definitive_errors = compile(
+    r"No Direct link function found|R\.I\.P|invalid URL|file not found|not public"
+    r"|link you entered is wrong|password is wrong|wrong password",
+    I,
+)
+_resolve_cache = OrderedDict()
+_resolve_cache_lock = Lock()
+
+
+def new_session():
+    session = Session()
+    session.mount("http://", _http_adapter)
+    session.mount("https://", _http_adapter)
+    return session
+
+
 debrid_link_supported_sites = [
     "1024tera.com",
     "1024terabox.com",
@@ -420,169 +457,97 @@ debrid_link_supported_sites = [
 ]
 
 
+def _walk_folders(fetch, details, root):
+    def fetch_folder(args):
+        with new_session() as session:
+            return fetch(session, *args)
+
+    level = [root]
+    while level:
+        results = list(_resolver_pool.map(fetch_folder, level))
+        level = []
+        for subfolders, items, size in results:
+            level.extend(subfolders)
+            details["contents"].extend(items)
+            details["total_size"] += size
+
+
+def _match_host(domain, hosts):
+    parts = domain.lower().split(".")
+    for index in range(len(parts) - 1):
+        if (host := ".".join(parts[index:])) in hosts:
+            return host
+
+
+def _get_cache_ttl(domain, result):
+    if isinstance(result, tuple):
+        return 0
+    ttl = _resolve_cache_ttls.get(
+        _match_host(domain, _resolve_cache_ttls), RESOLVE_CACHE_TTL
+    )
+    if isinstance(result, dict):
+        urls = [content["url"] for content in result["contents"]]
+    else:
+        urls = [result]
+    now = time()
+    for url in urls:
+        query = parse_qs(urlparse(url).query)
+        for key in ("expires", "Expires", "expire", "e"):
+            if (value := query.get(key)) and value[0].isdigit():
+                if (expiry := int(value[0])) > 1000000000:
+                    ttl = min(ttl, expiry - now - 30)
+                break
+    return ttl
+
+
+def _cache_result(link, result, error, ttl):
+    if ttl <= 0:
+        return
+    with _resolve_cache_lock:
+        _resolve_cache[link] = (time() + ttl, result, error)
+        _resolve_cache.move_to_end(link)
+        while len(_resolve_cache) > RESOLVE_CACHE_SIZE:
+            _resolve_cache.popitem(last=False)
+
+
 def direct_link_generator(link):
     """direct links generator"""
+    with _resolve_cache_lock:
+        if cached := _resolve_cache.get(link):
+            if cached[0] > time():
+                _resolve_cache.move_to_end(link)
+            else:
+                del _resolve_cache[link]
+                cached = None
+    if cached:
+        if cached[2] is not None:
+            raise DirectDownloadLinkException(cached[2])
+        return deepcopy(cached[1])
+    try:
+        result = _resolve_link(link)
+    except DirectDownloadLinkException as e:
+        if _definitive_errors.search(str(e)):
+            _cache_result(link, None, str(e), NEGATIVE_CACHE_TTL)
+        raise
+    domain = urlparse(link).hostname
+    _cache_result(link, deepcopy(result), None, _get_cache_ttl(domain, result))
+    return result
+
+
+def _resolve_link(link):
     domain = urlparse(link).hostname
     if not domain:
         raise DirectDownloadLinkException("ERROR: Invalid URL")
-    elif Config.DEBRID_LINK_API and any(
-        x in domain for x in debrid_link_supported_sites
-    ):
+    elif Config.DEBRID_LINK_API and _match_host(domain, debrid_link_hosts):
         return debrid_link(link)
     elif "yadi.sk" in link or "disk.yandex." in link:
         return yandex_disk(link)
-    elif "buzzheavier.com" in domain:
-        return buzzheavier(link)
+    elif host := _match_host(domain, direct_link_hosts):
+        return direct_link_hosts[host](link)
     elif "devuploads" in domain:
         return devuploads(link)
-    elif "lulacloud.com" in domain:
-        return lulacloud(link)
-    elif "fuckingfast.co" in domain:
-        return fuckingfast_dl(link)
-    elif "mediafire.com" in domain:
-        return mediafire(link)
-    elif "osdn.net" in domain:
-        return osdn(link)
-    elif "github.com" in domain:
-        return github(link)
-    elif "hxfile.co" in domain:
-        return hxfile(link)
-    elif "1drv.ms" in domain:
-        return onedrive(link)
-    elif "pixeldrain.com" in domain:
-        return pixeldrain(link)
     elif "racaty" in domain:
         return racaty(link)
-    elif "1fichier.com" in domain:
-        return fichier(link)
-    elif "solidfiles.com" in domain:
-        return solidfiles(link)
-    elif "krakenfiles.com" in domain:
-        return krakenfiles(link)
-    elif "upload.ee" in domain:
-        return uploadee(link)
-    elif "gofile.io" in domain:
-        return gofile(link)
-    elif "send.cm" in domain:
-        return send_cm(link)
-    elif "tmpsend.com" in domain:
-        return tmpsend(link)
-    elif "easyupload.io" in domain:
-        return easyupload(link)
-    elif "streamvid.net" in domain:
-        return streamvid(link)
-    elif "shrdsk.me" in domain:
-        return shrdsk(link)
-    elif "u.pcloud.link" in domain:
-        return pcloud(link)
-    elif "qiwi.gg" in domain:
-        return qiwi(link)
-    elif "mp4upload.com" in domain:
-        return mp4upload(link)
-    elif "berkasdrive.com" in domain:
-        return berkasdrive(link)
-    elif "swisstransfer.com" in domain:
-        return swisstransfer(link)
-    elif "instagram.com" in domain:
-        return instagram(link)
-    elif any(x in domain for x in ["akmfiles.com", "akmfls.xyz"]):
-        return akmfiles(link)
-    elif any(
-        x in domain
-        for x in [
-            "dood.watch",
-            "doodstream.com",
-            "dood.to",
-            "dood.so",
-            "dood.cx",
-            "dood.la",
-            "dood.ws",
-            "dood.sh",
-            "doodstream.co",
-            "dood.pm",
-            "dood.wf",
-            "dood.re",
-            "dood.video",
-            "dooood.com",
-            "dood.yt",
-            "doods.yt",
-            "dood.stream",
-            "doods.pro",
-            "ds2play.com",
-            "d0o0d.com",
-            "ds2video.com",
-            "do0od.com",
-            "d000d.com",
-        ]
-    ):
-        return doods(link)
-    elif any(
-        x in domain
-        for x in [
-            "streamtape.com",
-            "streamtape.co",
-            "streamtape.cc",
-            "streamtape.to",
-            "streamtape.net",
-            "streamta.pe",
-            "streamtape.xyz",
-        ]
-    ):
-        return streamtape(link)
-    elif any(x in domain for x in ["wetransfer.com", "we.tl"]):
-        return wetransfer(link)
-    elif any(
-        x in domain
-        for x in [
-            "terabox.com",
-            "nephobox.com",
-            "4funbox.com",
-            "mirrobox.com",
-            "momerybox.com",
-            "teraboxapp.com",
-            "1024tera.com",
-            "terabox.app",
-            "gibibox.com",
-            "goaibox.com",
-            "terasharelink.com",
-            "teraboxlink.com",
-            "freeterabox.com",
-            "1024terabox.com",
-            "teraboxshare.com",
-            "terafileshare.com",
-        ]
-    ):
-        return terabox(link)
-    elif any(
-        x in domain
-        for x in [
-            "filelions.co",
-            "filelions.site",
-            "filelions.live",
-            "filelions.to",
-            "mycloudz.cc",
-            "cabecabean.lol",
-            "filelions.online",
-            "embedwish.com",
-            "kitabmarkaz.xyz",
-            "wishfast.top",
-            "streamwish.to",
-            "kissmovies.net",
-        ]
-    ):
-        return filelions_and_streamwish(link)
-    elif any(x in domain for x in ["streamhub.ink", "streamhub.to"]):
-        return streamhub(link)
-    elif any(
-        x in domain
-        for x in [
-            "linkbox.to",
-            "lbx.to",
-            "teltobx.net",
-            "telbx.net",
-        ]
-    ):
-        return linkBox(link)
     elif is_share_link(link):
         if "gdtot" in domain:
             return gdtot(link)
@@ -590,28 +555,7 @@ def direct_link_generator(link):
             return filepress(link)
         else:
             return sharer_scraper(link)
-    elif any(
-        x in domain
-        for x in [
-            "anonfiles.com",
-            "zippyshare.com",
-            "letsupload.io",
-            "hotfile.io",
-            "bayfiles.com",
-            "megaupload.nz",
-            "letsupload.cc",
-            "filechan.org",
-            "myfile.is",
-            "vshare.is",
-            "rapidshare.nu",
-            "lolabits.se",
-            "openload.cc",
-            "share-online.is",
-            "upvid.cc",
-            "uptobox.com",
-            "uptobox.fr",
-        ]
-    ):
+    elif _match_host(domain, dead_hosts):
         raise DirectDownloadLinkException(f"ERROR: R.I.P {domain}")
     else:
         raise DirectDownloadLinkException(f"No Direct link function found for {link}")
@@ -669,7 +613,7 @@ def buzzheavier(url):
     @param link: URL from buzzheavier
     @return: Direct download link
     """
-    session = Session()
+    session = new_session()
     if "/download" not in url:
         url += "/download"
 
@@ -705,7 +649,7 @@ def fuckingfast_dl(url):
     @param url: URL from fuckingfast.co
     @return: Direct download link
     """
-    session = Session()
+    session = new_session()
     url = url.strip()
 
     try:
@@ -734,7 +678,7 @@ def devuploads(url):
     @param url: URL from devuploads.com
     @return: Direct download link
     """
-    session = Session()
+    session = new_session()
     res = session.get(url)
     html = HTML(res.text)
     if not html.xpath("//input[@name]"):
@@ -784,7 +728,7 @@ def lulacloud(url):
     @param url: URL from www.lulacloud.com
     @return: Direct download link
     """
-    session = Session()
+    session = new_session()
     try:
         res = session.post(url, headers={"Referer": url}, allow_redirects=False)
         return res.headers["location"]
@@ -905,7 +849,7 @@ def hxfile(url):
     except Exception as e:
         raise DirectDownloadLinkException(f"ERROR: {e.__class__.__name__}") from e
     cookies = {cookie.name: cookie.value for cookie in jar}
-    with Session() as session:
+    with new_session() as session:
         try:
             if url.strip().endswith(".html"):
                 url = url[:-5]
@@ -975,7 +919,7 @@ def streamtape(url):
     splitted_url = url.split("/")
     _id = splitted_url[4] if len(splitted_url) >= 6 else splitted_url[-1]
     try:
-        with Session() as session:
+        with new_session() as session:
             html = HTML(session.get(url).text)
     except Exception as e:
         raise DirectDownloadLinkException(f"ERROR: {e.__class__.__name__}") from e
@@ -1096,7 +1040,7 @@ def solidfiles(url):
 
 
 def krakenfiles(url):
-    with Session() as session:
+    with new_session() as session:
         try:
             _res = session.get(url)
         except Exception as e:
@@ -1397,16 +1341,18 @@ def linkBox(url: str):
             if "msg" in _json:
                 raise DirectDownloadLinkException(f"ERROR: {_json['msg']}")
             raise DirectDownloadLinkException("ERROR: data not found")
+        subfolders, items, total_size = [], [], 0
         try:
             if data["shareType"] == "singleItem":
-                return __singleItem(session, data["itemId"])
+                __singleItem(session, data["itemId"])
+                return subfolders, items, total_size
         except Exception:
             pass
         if not details["title"]:
             details["title"] = data["dirName"]
         contents = data["list"]
         if not contents:
-            return
+            return subfolders, items, total_size
         for content in contents:
             if content["type"] == "dir" and "url" not in content:
                 if not folderPath:
@@ -1415,7 +1361,7 @@ def linkBox(url: str):
                     newFolderPath = ospath.join(folderPath, content["name"])
                 if not details["title"]:
                     details["title"] = content["name"]
-                __fetch_links(session, content["id"], newFolderPath)
+                subfolders.append((content["id"], newFolderPath))
             elif "url" in content:
                 if not folderPath:
                     folderPath = details["title"]
@@ -1433,12 +1379,12 @@ def linkBox(url: str):
                     size = content["size"]
                     if isinstance(size, str) and size.isdigit():
                         size = float(size)
-                    details["total_size"] += size
-                details["contents"].append(item)
+                    total_size += size
+                items.append(item)
+        return subfolders, items, total_size
 
     try:
-        with Session() as session:
-            __fetch_links(session)
+        _walk_folders(__fetch_links, details, (0, ""))
     except DirectDownloadLinkException as e:
         raise e
     return details
@@ -1505,6 +1451,7 @@ def gofile(url):
         if not details["title"]:
             details["title"] = data["name"] if data["type"] == "folder" else _id
 
+        subfolders, items, total_size = [], [], 0
         contents = data["children"]
         for content in contents.values():
             if content["type"] == "folder":
@@ -1514,7 +1461,7 @@ def gofile(url):
                     newFolderPath = ospath.join(details["title"], content["name"])
                 else:
                     newFolderPath = ospath.join(folderPath, content["name"])
-                __fetch_links(session, content["id"], newFolderPath)
+                subfolders.append((content["id"], newFolderPath))
             else:
                 if not folderPath:
                     folderPath = details["title"]
@@ -1527,18 +1474,19 @@ def gofile(url):
                     size = content["size"]
                     if isinstance(size, str) and size.isdigit():
                         size = float(size)
-                    details["total_size"] += size
-                details["contents"].append(item)
+                    total_size += size
+                items.append(item)
+        return subfolders, items, total_size
 
     details = {"contents": [], "title": "", "total_size": 0}
-    with Session() as session:
+    with new_session() as session:
         try:
             token = __get_token(session)
         except Exception as e:
             raise DirectDownloadLinkException(f"ERROR: {e.__class__.__name__}")
         details["header"] = f"Cookie: accountToken={token}"
         try:
-            __fetch_links(session, _id)
+            _walk_folders(__fetch_links, details, (_id, ""))
         except Exception as e:
             raise DirectDownloadLinkException(e)
 
@@ -1674,9 +1622,12 @@ def mediafireFolder(url):
             __get_content(folderKey, folderPath, "files")
         else:
             files = _folder_content["files"]
-            for file in files:
+            urls = _resolver_pool.map(
+                lambda file: __scraper(file["links"]["normal_download"]), files
+            )
+            for file, _url in zip(files, urls):
                 item = {}
-                if not (_url := __scraper(file["links"]["normal_download"])):
+                if not _url:
                     continue
                 item["filename"] = file["filename"]
                 if not folderPath:
@@ -1773,7 +1724,7 @@ def send_cm(url):
         details["title"] = splitted_url[5]
     else:
         details["title"] = splitted_url[-1]
-    session = Session()
+    session = new_session()
 
     def __collectFolders(html):
         folders = []
@@ -1986,7 +1937,7 @@ def filelions_and_streamwish(url):
         quality = spited_file_code[1]
         file_code = spited_file_code[0]
     url = f"{scheme}://{hostname}/{file_code}"
-    with Session() as session:
+    with new_session() as session:
         try:
             _res = session.get(
                 f"{apiUrl}/api/file/direct_link",
@@ -2125,7 +2076,7 @@ def tmpsend(url):
 def qiwi(url):
     """qiwi.gg link generator
     based on https://github.com/aenulrofik"""
-    with Session() as session:
+    with new_session() as session:
         file_id = url.split("/")[-1]
         try:
             res = session.get(url).text
@@ -2140,7 +2091,7 @@ def qiwi(url):
 
 
 def mp4upload(url):
-    with Session() as session:
+    with new_session() as session:
         try:
             url = url.replace("embed-", "")
             req = session.get(url).text
@@ -2176,7 +2127,7 @@ def mp4upload(url):
 def berkasdrive(url):
     """berkasdrive.com link generator
     by https://github.com/aenulrofik"""
-    with Session() as session:
+    with new_session() as session:
         try:
             sesi = session.get(url).text
         except Exception as e:
@@ -2317,3 +2268,144 @@ def instagram(link: str) -> str:
 
     except Exception as e:
         raise DirectDownloadLinkException(f"ERROR: {e}")
+
+
+debrid_link_hosts = frozenset(debrid_link_supported_sites)
+
+direct_link_hosts = {
+    "buzzheavier.com": buzzheavier,
+    "lulacloud.com": lulacloud,
+    "fuckingfast.co": fuckingfast_dl,
+    "mediafire.com": mediafire,
+    "osdn.net": osdn,
+    "github.com": github,
+    "hxfile.co": hxfile,
+    "1drv.ms": onedrive,
+    "pixeldrain.com": pixeldrain,
+    "1fichier.com": fichier,
+    "solidfiles.com": solidfiles,
+    "krakenfiles.com": krakenfiles,
+    "upload.ee": uploadee,
+    "gofile.io": gofile,
+    "send.cm": send_cm,
+    "tmpsend.com": tmpsend,
+    "easyupload.io": easyupload,
+    "streamvid.net": streamvid,
+    "shrdsk.me": shrdsk,
+    "u.pcloud.link": pcloud,
+    "qiwi.gg": qiwi,
+    "mp4upload.com": mp4upload,
+    "berkasdrive.com": berkasdrive,
+    "swisstransfer.com": swisstransfer,
+    "instagram.com": instagram,
+    **dict.fromkeys(["akmfiles.com", "akmfls.xyz"], akmfiles),
+    **dict.fromkeys(
+        [
+            "dood.watch",
+            "doodstream.com",
+            "dood.to",
+            "dood.so",
+            "dood.cx",
+            "dood.la",
+            "dood.ws",
+            "dood.sh",
+            "doodstream.co",
+            "dood.pm",
+            "dood.wf",
+            "dood.re",
+            "dood.video",
+            "dooood.com",
+            "dood.yt",
+            "doods.yt",
+            "dood.stream",
+            "doods.pro",
+            "ds2play.com",
+            "d0o0d.com",
+            "ds2video.com",
+            "do0od.com",
+            "d000d.com",
+        ],
+        doods,
+    ),
+    **dict.fromkeys(
+        [
+            "streamtape.com",
+            "streamtape.co",
+            "streamtape.cc",
+            "streamtape.to",
+            "streamtape.net",
+            "streamta.pe",
+            "streamtape.xyz",
+        ],
+        streamtape,
+    ),
+    **dict.fromkeys(["wetransfer.com", "we.tl"], wetransfer),
+    **dict.fromkeys(
+        [
+            "terabox.com",
+            "nephobox.com",
+            "4funbox.com",
+            "mirrobox.com",
+            "momerybox.com",
+            "teraboxapp.com",
+            "1024tera.com",
+            "terabox.app",
+            "gibibox.com",
+            "goaibox.com",
+            "terasharelink.com",
+            "teraboxlink.com",
+            "freeterabox.com",
+            "1024terabox.com",
+            "teraboxshare.com",
+            "terafileshare.com",
+        ],
+        terabox,
+    ),
+    **dict.fromkeys(
+        [
+            "filelions.co",
+            "filelions.site",
+            "filelions.live",
+            "filelions.to",
+            "mycloudz.cc",
+            "cabecabean.lol",
+            "filelions.online",
+            "embedwish.com",
+            "kitabmarkaz.xyz",
+            "wishfast.top",
+            "streamwish.to",
+            "kissmovies.net",
+        ],
+        filelions_and_streamwish,
+    ),
+    **dict.fromkeys(["streamhub.ink", "streamhub.to"], streamhub),
+    **dict.fromkeys(["linkbox.to", "lbx.to", "teltobx.net", "telbx.net"], linkBox),
+}
+
+dead_hosts = frozenset(
+    [
+        "anonfiles.com",
+        "zippyshare.com",
+        "letsupload.io",
+        "hotfile.io",
+        "bayfiles.com",
+        "megaupload.nz",
+        "letsupload.cc",
+        "filechan.org",
+        "myfile.is",
+        "vshare.is",
+        "rapidshare.nu",
+        "lolabits.se",
+        "openload.cc",
+        "share-online.is",
+        "upvid.cc",
+        "uptobox.com",
+        "uptobox.fr",
+    ]
+)
+
+_resolve_cache_ttls.update(
+    (host, 0)
+    for host, resolver in direct_link_hosts.items()
+    if resolver in (fichier, doods, streamtape)
+)
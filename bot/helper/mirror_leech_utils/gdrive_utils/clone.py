@@ -1,6 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from googleapiclient.errors import HttpError
+from json import dump, load, loads
 from logging import getLogger
-from os import path as ospath
+from os import makedirs, path as ospath, remove, replace
+from threading import Lock, local
 from tenacity import (
     retry,
     wait_exponential,
@@ -8,18 +11,28 @@ from tenacity import (
     retry_if_exception_type,
     RetryError,
 )
-from time import time
+from time import sleep, time
 
 from ...ext_utils.bot_utils import async_to_sync
 from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+CLONE_WORKERS = 4
+COPY_BATCH_SIZE = 50
+CHECKPOINT_DIR = "clone_checkpoints"
+
 
 class GoogleDriveClone(GoogleDriveHelper):
     def __init__(self, listener):
         self.listener = listener
         self._start_time = time()
+        self._lock = Lock()
+        self._local = local()
+        self._workers = 0
+        self._checkpoint = {}
+        self._checkpoint_path = ""
+        self._copied = set()
         super().__init__()
         self.is_cloning = True
         self.user_setting()
@@ -58,7 +71,13 @@ class GoogleDriveClone(GoogleDriveHelper):
             meta = self.get_file_metadata(file_id)
             mime_type = meta.get("mimeType")
             if mime_type == self.G_DRIVE_DIR_MIME_TYPE:
-                dir_id = self.create_directory(meta.get("name"), self.listener.up_dest)
+                dir_id = self._load_checkpoint(meta.get("id"))
+                if dir_id is None:
+                    dir_id = self.create_directory(
+                        meta.get("name"), self.listener.up_dest
+                    )
+                    self._checkpoint["dest"] = dir_id
+                    self._save_checkpoint()
                 self._clone_folder(meta.get("name"), meta.get("id"), dir_id)
                 durl = self.G_DRIVE_DIR_BASE_DOWNLOAD_URL.format(dir_id)
                 if self.listener.is_cancelled:
@@ -66,7 +85,9 @@ class GoogleDriveClone(GoogleDriveHelper):
                     self.service.files().delete(
                         fileId=dir_id, supportsAllDrives=True
                     ).execute()
+                    self._remove_checkpoint()
                     return None, None, None, None, None
+                self._remove_checkpoint()
                 mime_type = "Folder"
                 self.listener.size = self.proc_bytes
             else:
@@ -88,6 +109,7 @@ class GoogleDriveClone(GoogleDriveHelper):
                 LOGGER.info(f"Total Attempts: {err.last_attempt.attempt_number}")
                 err = err.last_attempt.exception()
             err = str(err).replace(">", "").replace("<", "")
+            self._save_checkpoint()
             if "User rate limit exceeded" in err:
                 msg = "User rate limit exceeded."
             elif "File not found" in err:
@@ -102,29 +124,207 @@ class GoogleDriveClone(GoogleDriveHelper):
             async_to_sync(self.listener.on_upload_error, msg)
             return None, None, None, None, None
 
+    def _load_checkpoint(self, folder_id):
+        self._checkpoint_path = (
+            f"{CHECKPOINT_DIR}/{folder_id}_{self.listener.up_dest}.json".replace(
+                ":", "_"
+            )
+        )
+        self._checkpoint = {}
+        if not ospath.exists(self._checkpoint_path):
+            self._remove_checkpoint()
+            return None
+        try:
+            with open(self._checkpoint_path) as f:
+                checkpoint = load(f)
+            self.get_file_metadata(checkpoint["dest"])
+            if ospath.exists(f"{self._checkpoint_path}.files"):
+                with open(f"{self._checkpoint_path}.files") as f:
+                    self._copied = {line.strip() for line in f if line.strip()}
+        except Exception as e:
+            LOGGER.error(f"Ignoring clone checkpoint {self._checkpoint_path}: {e}")
+            self._remove_checkpoint()
+            return None
+        self._checkpoint = checkpoint
+        LOGGER.info(
+            f"Resuming clone from checkpoint: {len(self._copied)} files already copied"
+        )
+        return checkpoint["dest"]
+
+    def _save_checkpoint(self):
+        if not self._checkpoint_path or not self._checkpoint:
+            return
+        with self._lock:
+            makedirs(CHECKPOINT_DIR, exist_ok=True)
+            with open(f"{self._checkpoint_path}.tmp", "w") as f:
+                dump(self._checkpoint, f)
+            replace(f"{self._checkpoint_path}.tmp", self._checkpoint_path)
+
+    def _log_copied(self, file_ids):
+        if not self._checkpoint_path or not file_ids:
+            return
+        with self._lock:
+            makedirs(CHECKPOINT_DIR, exist_ok=True)
+            with open(f"{self._checkpoint_path}.files", "a") as f:
+                f.write("".join(f"{file_id}\n" for file_id in file_ids))
+
+    def _remove_checkpoint(self):
+        for path in (self._checkpoint_path, f"{self._checkpoint_path}.files"):
+            if self._checkpoint_path and ospath.exists(path):
+                remove(path)
+        self._checkpoint = {}
+        self._copied = set()
+
+    def _get_worker(self):
+        if (worker := getattr(self._local, "worker", None)) is None:
+            worker = GoogleDriveHelper()
+            worker.token_path = self.token_path
+            worker.use_sa = self.use_sa
+            with self._lock:
+                self._workers += 1
+                sa_index = self.sa_index + self._workers
+            worker.service = worker.authorize(sa_index)
+            self._local.worker = worker
+        return worker
+
+    def _list_folder(self, folder_id):
+        return self._get_worker().get_files_by_folder_id(folder_id)
+
     def _clone_folder(self, folder_name, folder_id, dest_id):
-        LOGGER.info(f"Syncing: {folder_name}")
-        files = self.get_files_by_folder_id(folder_id)
-        if len(files) == 0:
-            return dest_id
-        for file in files:
-            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
-                self.total_folders += 1
-                file_path = ospath.join(folder_name, file.get("name"))
-                current_dir_id = self.create_directory(file.get("name"), dest_id)
-                self._clone_folder(file_path, file.get("id"), current_dir_id)
-            elif (
-                not file.get("name")
-                .strip()
-                .lower()
-                .endswith(tuple(self.listener.excluded_extensions))
-            ):
-                self.total_files += 1
-                self._copy_file(file.get("id"), dest_id)
-                self.proc_bytes += int(file.get("size", 0))
-                self.total_time = int(time() - self._start_time)
-            if self.listener.is_cancelled:
-                break
+        folders = self._checkpoint.setdefault("folders", {})
+        folders[folder_id] = dest_id
+        copied = self._copied
+        level = [(folder_name, folder_id, dest_id)]
+        futures = []
+        with ThreadPoolExecutor(max_workers=CLONE_WORKERS) as executor:
+            try:
+                while level and not self.listener.is_cancelled:
+                    sub_dirs = []
+                    batch = []
+                    for (name, _, dir_id), files in zip(
+                        level, executor.map(self._list_folder, [f[1] for f in level])
+                    ):
+                        LOGGER.info(f"Syncing: {name}")
+                        for file in files:
+                            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
+                                self.total_folders += 1
+                                sub_dirs.append(
+                                    (ospath.join(name, file.get("name")), file, dir_id)
+                                )
+                            elif (
+                                not file.get("name")
+                                .strip()
+                                .lower()
+                                .endswith(tuple(self.listener.excluded_extensions))
+                            ):
+                                if file.get("id") in copied:
+                                    self._file_copied(file)
+                                    continue
+                                batch.append((file, dir_id))
+                                if len(batch) == COPY_BATCH_SIZE:
+                                    futures.append(
+                                        executor.submit(self._copy_batch, batch)
+                                    )
+                                    batch = []
+                    if batch:
+                        futures.append(executor.submit(self._copy_batch, batch))
+                    if new_dirs := [
+                        (file, dir_id)
+                        for _, file, dir_id in sub_dirs
+                        if file.get("id") not in folders
+                    ]:
+                        dir_ids = self.create_directories(
+                            [(file.get("name"), dir_id) for file, dir_id in new_dirs]
+                        )
+                        with self._lock:
+                            for (file, _), new_id in zip(new_dirs, dir_ids):
+                                folders[file.get("id")] = new_id
+                        self._save_checkpoint()
+                    level = [
+                        (path, file.get("id"), folders[file.get("id")])
+                        for path, file, _ in sub_dirs
+                    ]
+                    for future in [f for f in futures if f.done()]:
+                        future.result()
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _file_copied(self, file):
+        with self._lock:
+            self.total_files += 1
+            self.proc_bytes += int(file.get("size", 0))
+            self.total_time = int(time() - self._start_time)
+
+    @staticmethod
+    def _get_reason(err):
+        if isinstance(err, HttpError) and err.resp.get("content-type", "").startswith(
+            "application/json"
+        ):
+            try:
+                return loads(err.content)["error"]["errors"][0]["reason"]
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                LOGGER.warning(f"Unable to read Drive error reason: {e}")
+        return ""
+
+    def _copy_batch(self, batch):
+        worker = self._get_worker()
+        attempts = 0
+        while batch and not self.listener.is_cancelled:
+            results = worker.execute_batch(
+                [
+                    worker.service.files().copy(
+                        fileId=file.get("id"),
+                        body={"parents": [dest_id]},
+                        supportsAllDrives=True,
+                        fields="id",
+                    )
+                    for file, dest_id in batch
+                ]
+            )
+            failed = []
+            copied = []
+            rate_limited = False
+            try:
+                for (file, dest_id), (_, err) in zip(batch, results):
+                    if err is None:
+                        self._file_copied(file)
+                        copied.append(file.get("id"))
+                        continue
+                    reason = self._get_reason(err)
+                    if reason == "cannotCopyFile":
+                        LOGGER.error(err)
+                    elif reason in ["userRateLimitExceeded", "dailyLimitExceeded"]:
+                        rate_limited = True
+                        failed.append((file, dest_id, err))
+                    elif reason in ["rateLimitExceeded", "backendError"] or (
+                        isinstance(err, HttpError)
+                        and err.resp.status in [429, 500, 502, 503, 504]
+                    ):
+                        failed.append((file, dest_id, err))
+                    else:
+                        raise err
+            finally:
+                self._log_copied(copied)
+            if not failed:
+                return
+            if rate_limited:
+                if not worker.use_sa or worker.sa_count >= worker.sa_number:
+                    if worker.use_sa:
+                        LOGGER.info(
+                            f"Reached maximum number of service accounts switching, which is {worker.sa_count}"
+                        )
+                    raise failed[0][2]
+                worker.switch_service_account()
+            else:
+                attempts += 1
+                if attempts > 5:
+                    raise failed[0][2]
+                sleep(min(2**attempts, 32))
+            batch = [(file, dest_id) for file, dest_id, _ in failed]
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
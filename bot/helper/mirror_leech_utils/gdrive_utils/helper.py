@@ -69,12 +69,16 @@ class GoogleDriveHelper:
             self.proc_bytes += chunk_size
             self.total_time += self.update_interval
 
-    def authorize(self):
+    def authorize(self, sa_index=None):
         credentials = None
         if self.use_sa:
             json_files = listdir("accounts")
             self.sa_number = len(json_files)
-            self.sa_index = randrange(self.sa_number)
+            self.sa_index = (
+                randrange(self.sa_number)
+                if sa_index is None
+                else sa_index % self.sa_number
+            )
             LOGGER.info(f"Authorizing with {json_files[self.sa_index]} service account")
             credentials = service_account.Credentials.from_service_account_file(
                 f"accounts/{json_files[self.sa_index]}", scopes=self._OAUTH_SCOPE
@@ -96,7 +100,7 @@ class GoogleDriveHelper:
             self.sa_index += 1
         self.sa_count += 1
         LOGGER.info(f"Switching to {self.sa_index} index")
-        self.service = self.authorize()
+        self.service = self.authorize(self.sa_index)
 
     def get_id_from_url(self, link, user_id=""):
         if user_id and link.startswith("mtp:"):
@@ -213,6 +217,62 @@ class GoogleDriveHelper:
         LOGGER.info(f"Created G-Drive Folder:\nName: {file.get('name')}\nID: {file_id}")
         return file_id
 
+    def execute_batch(self, requests):
+        results = [(None, None)] * len(requests)
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        for start in range(0, len(requests), 100):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for index in range(start, min(start + 100, len(requests))):
+                batch.add(requests[index], request_id=str(index))
+            batch.execute()
+        return results
+
+    def create_directories(self, directories):
+        requests = []
+        for directory_name, dest_id in directories:
+            file_metadata = {
+                "name": directory_name,
+                "description": "Uploaded by Mirror-leech-telegram-bot",
+                "mimeType": self.G_DRIVE_DIR_MIME_TYPE,
+            }
+            if dest_id is not None:
+                file_metadata["parents"] = [dest_id]
+            requests.append(
+                self.service.files().create(
+                    body=file_metadata, supportsAllDrives=True, fields="id"
+                )
+            )
+        ids = [
+            response and response["id"] for response, _ in self.execute_batch(requests)
+        ]
+        if not Config.IS_TEAM_DRIVE:
+            permissions = {
+                "role": "reader",
+                "type": "anyone",
+                "value": None,
+                "withLink": True,
+            }
+            created = [file_id for file_id in ids if file_id]
+            results = self.execute_batch(
+                [
+                    self.service.permissions().create(
+                        fileId=file_id, body=permissions, supportsAllDrives=True
+                    )
+                    for file_id in created
+                ]
+            )
+            for file_id, (_, exception) in zip(created, results):
+                if exception is not None:
+                    self.set_permission(file_id)
+        for index, file_id in enumerate(ids):
+            if not file_id:
+                ids[index] = self.create_directory(*directories[index])
+        LOGGER.info(f"Created {len(ids)} G-Drive Folders")
+        return ids
+
     def escapes(self, estr):
         chars = ["\\", "'", '"', r"\a", r"\b", r"\f", r"\n", r"\r", r"\t"]
         for char in chars:
@@ -1,4 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging import getLogger
+from os import path as ospath
+from threading import Lock, local
+from time import time
 
 from .... import drives_names, drives_ids, index_urls, user_data
 from ....helper.ext_utils.status_utils import get_readable_file_size
@@ -6,6 +10,14 @@ from ....helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+SEARCH_CACHE_TTL = 60
+SEARCH_WORKERS = 8
+
+_search_cache = {}
+_search_cache_lock = Lock()
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS)
+_services = local()
+
 
 class GoogleDriveSearch(GoogleDriveHelper):
     def __init__(self, stop_dup=False, no_multi=False, is_recursive=True, item_type=""):
@@ -15,8 +27,23 @@ class GoogleDriveSearch(GoogleDriveHelper):
         self._is_recursive = is_recursive
         self._item_type = item_type
 
+    def _get_service(self):
+        if (services := getattr(_services, "services", None)) is None:
+            services = _services.services = {}
+        key = (self.use_sa, self.token_path)
+        stamp = None
+        if not self.use_sa:
+            if not ospath.exists(self.token_path):
+                services.pop(key, None)
+                return self.authorize()
+            stamp = ospath.getmtime(self.token_path)
+        if (cached := services.get(key)) is None or cached[0] != stamp:
+            cached = services[key] = (stamp, self.authorize())
+        return cached[1]
+
     def _drive_query(self, dir_id, file_name, is_recursive):
         try:
+            service = self._get_service()
             if is_recursive:
                 if self._stop_dup:
                     query = f"name = '{file_name}' and "
@@ -34,7 +61,7 @@ class GoogleDriveSearch(GoogleDriveHelper):
                 query += "trashed = false"
                 if dir_id == "root":
                     return (
-                        self.service.files()
+                        service.files()
                         .list(
                             q=f"{query} and 'me' in owners",
                             pageSize=200,
@@ -46,7 +73,7 @@ class GoogleDriveSearch(GoogleDriveHelper):
                     )
                 else:
                     return (
-                        self.service.files()
+                        service.files()
                         .list(
                             supportsAllDrives=True,
                             includeItemsFromAllDrives=True,
@@ -75,7 +102,7 @@ class GoogleDriveSearch(GoogleDriveHelper):
                         query += f"mimeType = '{self.G_DRIVE_DIR_MIME_TYPE}' and "
                 query += "trashed = false"
                 return (
-                    self.service.files()
+                    service.files()
                     .list(
                         supportsAllDrives=True,
                         includeItemsFromAllDrives=True,
@@ -90,7 +117,50 @@ class GoogleDriveSearch(GoogleDriveHelper):
         except Exception as err:
             err = str(err).replace(">", "").replace("<", "")
             LOGGER.error(err)
+            return None
+
+    def _search_drive(self, dir_id, file_name):
+        is_recursive = (
+            False if self._is_recursive and len(dir_id) > 23 else self._is_recursive
+        )
+        key = (
+            dir_id,
+            file_name,
+            is_recursive,
+            self._stop_dup,
+            self._item_type,
+            self.use_sa,
+            self.token_path,
+        )
+        with _search_cache_lock:
+            cached = _search_cache.get(key)
+        if cached and cached[0] > time():
+            return cached[1]
+        response = self._drive_query(dir_id, file_name, is_recursive)
+        if response is None:
             return {"files": []}
+        with _search_cache_lock:
+            if len(_search_cache) > 1000:
+                for k in [k for k, v in _search_cache.items() if v[0] <= time()]:
+                    del _search_cache[k]
+            _search_cache[key] = (time() + SEARCH_CACHE_TTL, response)
+        return response
+
+    def _search_drives(self, drives, file_name):
+        futures = [
+            _search_pool.submit(self._search_drive, dir_id, file_name)
+            for _, dir_id, _ in drives
+        ]
+        try:
+            if self._stop_dup:
+                for future in as_completed(futures):
+                    if (response := future.result())["files"]:
+                        return [(drives[futures.index(future)], response)]
+                return []
+            return [(drive, future.result()) for drive, future in zip(drives, futures)]
+        finally:
+            for future in futures:
+                future.cancel()
 
     def drive_list(self, file_name, target_id="", user_id=""):
         msg = ""
@@ -118,18 +188,15 @@ class GoogleDriveSearch(GoogleDriveHelper):
         ):
             self.use_sa = False
 
-        self.service = self.authorize()
+        drives = list(drives)
+        if self._no_multi:
+            drives = drives[:1]
 
-        for drive_name, dir_id, index_url in drives:
-            isRecur = (
-                False if self._is_recursive and len(dir_id) > 23 else self._is_recursive
-            )
-            response = self._drive_query(dir_id, file_name, isRecur)
+        for (drive_name, _, index_url), response in self._search_drives(
+            drives, file_name
+        ):
             if not response["files"]:
-                if self._no_multi:
-                    break
-                else:
-                    continue
+                continue
             if not Title:
                 msg += f"<h4>Search Result For {file_name}</h4>"
                 Title = True
@@ -165,8 +232,6 @@ class GoogleDriveSearch(GoogleDriveHelper):
                 if len(msg.encode("utf-8")) > 39000:
                     telegraph_content.append(msg)
                     msg = ""
-            if self._no_multi:
-                break
 
         if msg != "":
             telegraph_content.append(msg)
@@ -1,7 +1,9 @@
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging import getLogger
 from os import path as ospath, listdir, remove
+from threading import Lock, local
 from tenacity import (
     retry,
     wait_exponential,
@@ -17,6 +19,8 @@ from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+UPLOAD_WORKERS = 4
+
 
 class GoogleDriveUpload(GoogleDriveHelper):
     def __init__(self, listener, path):
@@ -24,9 +28,30 @@ class GoogleDriveUpload(GoogleDriveHelper):
         self._updater = None
         self._path = path
         self._is_errored = False
+        self._lock = Lock()
+        self._local = local()
+        self._workers = []
         super().__init__()
         self.is_uploading = True
 
+    async def progress(self):
+        with self._lock:
+            for uploader in [self, *self._workers]:
+                if uploader.status is not None:
+                    chunk_size = (
+                        uploader.status.total_size * uploader.status.progress()
+                        - uploader.file_processed_bytes
+                    )
+                    uploader.file_processed_bytes += chunk_size
+                    self.proc_bytes += chunk_size
+        self.total_time += self.update_interval
+
+    def _file_uploaded(self, uploader, file_size):
+        with self._lock:
+            self.proc_bytes += file_size - uploader.file_processed_bytes
+            uploader.file_processed_bytes = 0
+            uploader.status = None
+
     def user_setting(self):
         if self.listener.up_dest.startswith("mtp:"):
             self.token_path = f"tokens/{self.listener.user_id}.pickle"
@@ -47,6 +72,7 @@ class GoogleDriveUpload(GoogleDriveHelper):
         try:
             if ospath.isfile(self._path):
                 mime_type = get_mime_type(self._path)
+                file_size = ospath.getsize(self._path)
                 link = self._upload_file(
                     self._path,
                     self.listener.name,
@@ -54,6 +80,7 @@ class GoogleDriveUpload(GoogleDriveHelper):
                     self.listener.up_dest,
                     in_dir=False,
                 )
+                self._file_uploaded(self, file_size)
                 if self.listener.is_cancelled:
                     return
                 if link is None:
@@ -102,25 +129,61 @@ class GoogleDriveUpload(GoogleDriveHelper):
             return
 
     def _upload_dir(self, input_directory, dest_id):
-        list_dirs = listdir(input_directory)
-        if len(list_dirs) == 0:
-            return dest_id
-        new_id = None
-        for item in list_dirs:
-            current_file_name = ospath.join(input_directory, item)
-            if ospath.isdir(current_file_name):
-                current_dir_id = self.create_directory(item, dest_id)
-                new_id = self._upload_dir(current_file_name, current_dir_id)
-                self.total_folders += 1
-            else:
-                mime_type = get_mime_type(current_file_name)
-                file_name = current_file_name.split("/")[-1]
-                self._upload_file(current_file_name, file_name, mime_type, dest_id)
-                self.total_files += 1
-                new_id = dest_id
-            if self.listener.is_cancelled:
+        files = []
+        directories = [(input_directory, dest_id)]
+        while directories and not self.listener.is_cancelled:
+            sub_dirs = []
+            for dir_path, dir_id in directories:
+                for item in listdir(dir_path):
+                    current_file_name = ospath.join(dir_path, item)
+                    if ospath.isdir(current_file_name):
+                        sub_dirs.append((current_file_name, item, dir_id))
+                    else:
+                        files.append((current_file_name, item, dir_id))
+            if not sub_dirs:
                 break
-        return new_id
+            dir_ids = self.create_directories(
+                [(item, dir_id) for _, item, dir_id in sub_dirs]
+            )
+            self.total_folders += len(sub_dirs)
+            directories = [
+                (dir_path, dir_id)
+                for (dir_path, _, _), dir_id in zip(sub_dirs, dir_ids)
+            ]
+        if files and not self.listener.is_cancelled:
+            with ThreadPoolExecutor(
+                max_workers=min(UPLOAD_WORKERS, len(files))
+            ) as executor:
+                futures = [executor.submit(self._upload_task, *f) for f in files]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        self.total_files += 1
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        return None if self.listener.is_cancelled else dest_id
+
+    def _get_worker(self):
+        if (worker := getattr(self._local, "worker", None)) is None:
+            worker = GoogleDriveUpload(self.listener, self._path)
+            worker.token_path = self.token_path
+            worker.use_sa = self.use_sa
+            with self._lock:
+                self._workers.append(worker)
+                sa_index = self.sa_index + len(self._workers)
+            worker.service = worker.authorize(sa_index)
+            self._local.worker = worker
+        return worker
+
+    def _upload_task(self, file_path, file_name, dest_id):
+        if self.listener.is_cancelled:
+            return
+        worker = self._get_worker()
+        file_size = ospath.getsize(file_path)
+        worker._upload_file(file_path, file_name, get_mime_type(file_path), dest_id)
+        self._file_uploaded(worker, file_size)
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -206,7 +269,6 @@ class GoogleDriveUpload(GoogleDriveHelper):
             remove(file_path)
         except Exception:
             pass
-        self.file_processed_bytes = 0
         if not Config.IS_TEAM_DRIVE:
             self.set_permission(response["id"])
         if not in_dir:
@@ -1,7 +1,7 @@
 from time import time
 
 from .... import LOGGER
-from ....core.torrent_manager import TorrentManager, aria2_name
+from ....core.torrent_manager import TorrentManager, TorrentSnapshot, aria2_name
 from ...ext_utils.status_utils import (
     EngineStatus,
     MirrorStatus,
@@ -12,7 +12,7 @@ from ...ext_utils.status_utils import (
 
 async def get_download(gid, old_info=None):
     try:
-        res = await TorrentManager.aria2.tellStatus(gid)
+        res = await TorrentSnapshot.aria2(gid)
         return res or old_info
     except Exception as e:
         LOGGER.error(f"{e}: Aria2c, Error while getting torrent info")
@@ -1,7 +1,7 @@
 from asyncio import sleep, gather
 
 from .... import LOGGER, qb_torrents, qb_listener_lock
-from ....core.torrent_manager import TorrentManager
+from ....core.torrent_manager import TorrentManager, TorrentSnapshot
 from ...ext_utils.status_utils import (
     MirrorStatus,
     EngineStatus,
@@ -12,7 +12,7 @@ from ...ext_utils.status_utils import (
 
 async def get_download(tag, old_info=None):
     try:
-        res = (await TorrentManager.qbittorrent.torrents.info(tag=tag))[0]
+        res = await TorrentSnapshot.qbittorrent(tag)
         return res or old_info
     except Exception as e:
         LOGGER.error(f"{e}: Qbittorrent, while getting torrent info. Tag: {tag}")
@@ -1,7 +1,8 @@
-from asyncio import sleep
+from asyncio import Queue, sleep
+from functools import partial
 from logging import getLogger
 from os import path as ospath, walk
-from re import match as re_match, sub as re_sub
+from re import escape, match as re_match, sub as re_sub
 from time import time
 
 from aioshutil import rmtree
@@ -31,10 +32,16 @@ from tenacity import (
     wait_exponential,
 )
 
+from .... import bot_loop
 from ....core.config_manager import Config
 from ....core.tg_client import TgClient
 from ...ext_utils.bot_utils import sync_to_async
-from ...ext_utils.files_utils import get_base_name, is_archive
+from ...ext_utils.files_utils import (
+    FilePart,
+    get_base_name,
+    get_file_parts,
+    is_archive,
+)
 from ...ext_utils.status_utils import get_readable_file_size, get_readable_time
 from ...ext_utils.media_utils import (
     get_audio_thumbnail,
@@ -42,7 +49,7 @@ from ...ext_utils.media_utils import (
     get_media_info,
     get_multiple_frames_thumbnail,
     get_video_thumbnail,
-    get_md5_hash,
+    get_file_hashes,
 )
 from ...telegram_helper.message_utils import delete_message
 
@@ -76,6 +83,10 @@ class TelegramUploader:
         self._log_msg = None
         self._user_session = self._listener.user_transmission
         self._error = ""
+        self._is_log_del = False
+        self._stage_queue = None
+        self._user_queue = None
+        self._stage_queues = []
 
     async def _upload_progress(self, current, _):
         if self._listener.is_cancelled:
@@ -151,7 +162,7 @@ class TelegramUploader:
             self._sent_msg = self._listener.message
         return True
 
-    async def _prepare_file(self, pre_file_, dirpath):
+    async def _prepare_file(self, pre_file_, dirpath, part=None):
         cap_file_ = file_ = pre_file_
 
         if self._lprefix:
@@ -183,23 +194,40 @@ class TelegramUploader:
             parts[0] = re_sub(
                 r"\{([^}]+)\}", lambda m: f"{{{m.group(1).lower()}}}", parts[0]
             )
-            up_path = ospath.join(dirpath, pre_file_)
-            dur, qual, lang, subs = await get_media_info(up_path, True)
+            if part is None:
+                up_path = ospath.join(dirpath, pre_file_)
+                dur, qual, lang, subs = await get_media_info(up_path, True)
+                size = await aiopath.getsize(up_path)
+                ranges = {}
+            else:
+                up_path = part.path
+                dur, qual, lang, subs = 0, "", "", ""
+                size = part.length
+                ranges = {"offset": part.offset, "length": part.length}
+            hashes = {"md5_hash": "md5", "sha1_hash": "sha1", "crc32": "crc32"}
+            hashes = {key: algo for key, algo in hashes.items() if key in parts[0]}
+            if hashes:
+                digests = await sync_to_async(
+                    get_file_hashes, up_path, *hashes.values(), **ranges
+                )
+                hashes = {key: digests[algo] for key, algo in hashes.items()}
             cap_mono = parts[0].format(
                 filename=cap_file_,
-                size=get_readable_file_size(await aiopath.getsize(up_path)),
+                size=get_readable_file_size(size),
                 duration=get_readable_time(dur),
                 quality=qual,
                 languages=lang,
                 subtitles=subs,
-                md5_hash=await sync_to_async(get_md5_hash, up_path),
+                md5_hash=hashes.get("md5_hash", ""),
+                sha1_hash=hashes.get("sha1_hash", ""),
+                crc32=hashes.get("crc32", ""),
                 mime_type=self._listener.file_details.get("mime_type", "text/plain"),
                 prefilename=self._listener.file_details.get("filename", ""),
                 precaption=self._listener.file_details.get("caption", ""),
             )
 
-            for part in parts[1:]:
-                args = part.split(":")
+            for rule in parts[1:]:
+                args = rule.split(":")
                 cap_mono = cap_mono.replace(
                     args[0],
                     args[1] if len(args) > 1 else "",
@@ -232,7 +260,9 @@ class TelegramUploader:
             name, ext = ospath.splitext(file_)
             file_ = f"{name}{self._lsuffix}{ext}"
 
-        if pre_file_ != file_:
+        if part is not None:
+            part.name = file_
+        elif pre_file_ != file_:
             new_path = ospath.join(dirpath, file_)
             await rename(self._up_path, new_path)
             self._up_path = new_path
@@ -314,89 +344,312 @@ class TelegramUploader:
             if not self._listener.is_cancelled:
                 LOGGER.error(f"Failed To Send in BotPM:\n{str(err)}")
 
-    async def upload(self):
-        await self._user_settings()
-        res = await self._msg_to_reply()
-        if not res:
+    @staticmethod
+    def _get_stage_chat():
+        chat, thread_id = Config.LEECH_DUMP_CHAT, None
+        if isinstance(chat, int):
+            return chat, thread_id
+        chat = re_sub(r"^[buh]:", "", chat)
+        if "|" in chat:
+            chat, thread_id = list(
+                map(
+                    lambda x: int(x) if x.lstrip("-").isdigit() else x,
+                    chat.split("|", 1),
+                )
+            )
+        elif chat.lstrip("-").isdigit():
+            chat = int(chat)
+        elif chat.lower() == "pm":
+            return None, None
+        return chat, thread_id
+
+    def _start_stage_workers(self):
+        if (
+            not TgClient.helper_bots
+            or not Config.LEECH_DUMP_CHAT
+            or self._user_session
+            and not self._listener.hybrid_leech
+        ):
+            return []
+        dump_chat, thread_id = self._get_stage_chat()
+        if not dump_chat:
+            return []
+        self._stage_queue = Queue()
+        workers = [
+            (self._listener.client, dump_chat, thread_id, self._stage_queue, None)
+        ]
+        workers.extend(
+            (hbot, dump_chat, thread_id, self._stage_queue, index)
+            for index, hbot in TgClient.helper_bots.items()
+        )
+        if self._listener.hybrid_leech and self._listener.user_transmission:
+            self._user_queue = Queue()
+            workers.append(
+                (
+                    TgClient.user,
+                    self._sent_msg.chat.id,
+                    self._listener.chat_thread_id,
+                    self._user_queue,
+                    None,
+                )
+            )
+        self._stage_queues = [worker[3] for worker in workers]
+        return [bot_loop.create_task(self._stage_worker(*w)) for w in workers]
+
+    async def _stage_worker(self, client, chat_id, thread_id, queue, index):
+        while (job := await queue.get()) is not None:
+            if self._listener.is_cancelled:
+                job["staged"].set_result(None)
+                continue
+            job["client"] = client
+            if index is not None:
+                TgClient.helper_loads[index] += 1
+            try:
+                job["staged"].set_result(
+                    await self._stage_file(client, chat_id, thread_id, job)
+                )
+            except RetryError as err:
+                LOGGER.error(f"Staging failed for {job['path']}: {err}")
+                job["staged"].set_exception(err)
+            finally:
+                if index is not None:
+                    TgClient.helper_loads[index] -= 1
+
+    def _stage_progress(self, client, job):
+        async def progress(current, _):
+            if self._listener.is_cancelled:
+                client.stop_transmission()
+            self._processed_bytes += current - job["sent"]
+            job["sent"] = current
+
+        return progress
+
+    def _stage(self, job):
+        job["staged"] = bot_loop.create_future()
+        if self._user_queue is not None and job["size"] > 2097152000:
+            self._user_queue.put_nowait(job)
+        else:
+            self._stage_queue.put_nowait(job)
+
+    async def _copy_staged(self, job):
+        staged = await job["staged"]
+        if staged is None or self._listener.is_cancelled:
             return
-        is_log_del = False
+        self._is_corrupted = False
+        client = (
+            TgClient.user if job["client"] is TgClient.user else self._listener.client
+        )
+        try:
+            self._sent_msg = await client.copy_message(
+                chat_id=self._sent_msg.chat.id,
+                from_chat_id=staged.chat.id,
+                message_id=staged.id,
+                reply_to_message_id=self._sent_msg.id,
+                disable_notification=True,
+            )
+        except (FloodWait, FloodPremiumWait) as f:
+            LOGGER.warning(str(f))
+            await sleep(f.value * 1.3)
+            return await self._copy_staged(job)
+        await delete_message(staged)
+        await self._on_file_sent(job["o_path"])
+
+    def _on_upload_error(self, err):
+        if isinstance(err, RetryError):
+            LOGGER.info(f"Total Attempts: {err.last_attempt.attempt_number}")
+            err = err.last_attempt.exception()
+        LOGGER.error(f"{err}. Path: {self._up_path}", exc_info=True)
+        self._error = str(err)
+        self._corrupted += 1
+
+    async def _process_file(self, job):
+        if "screenshots" in job:
+            await self._send_screenshots(job["dirpath"], job["screenshots"])
+            await rmtree(job["dirpath"], ignore_errors=True)
+            return
+        self._up_path = job["path"]
+        try:
+            if self._last_msg_in_group:
+                group_lists = [x for v in self._media_dict.values() for x in v.keys()]
+                match = re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", job["o_path"])
+                if not match or match and match.group(0) not in group_lists:
+                    for key, value in list(self._media_dict.items()):
+                        for subkey, msgs in list(value.items()):
+                            if len(msgs) > 1:
+                                await self._send_media_group(subkey, key, msgs)
+            self._last_msg_in_group = False
+            if "staged" in job:
+                await self._copy_staged(job)
+            else:
+                if self._listener.hybrid_leech and self._listener.user_transmission:
+                    self._user_session = job["size"] > 2097152000
+                    if self._user_session:
+                        self._sent_msg = await TgClient.user.get_messages(
+                            chat_id=self._sent_msg.chat.id,
+                            message_ids=self._sent_msg.id,
+                        )
+                    else:
+                        self._sent_msg = await self._listener.client.get_messages(
+                            chat_id=self._sent_msg.chat.id,
+                            message_ids=self._sent_msg.id,
+                        )
+                self._last_uploaded = 0
+                await self._upload_file(
+                    job["part"] or self._up_path,
+                    job["cap_mono"],
+                    job["file"],
+                    job["o_path"],
+                )
+            if self._log_msg and not self._is_log_del and Config.CLEAN_LOG_MSG:
+                await delete_message(self._log_msg)
+                self._is_log_del = True
+            if self._listener.is_cancelled:
+                return
+            if (
+                not self._is_corrupted
+                and (self._listener.is_super_chat or self._listener.up_dest)
+                and not self._is_private
+            ):
+                self._msgs_dict[self._sent_msg.link] = job["file"]
+        except Exception as err:
+            self._on_upload_error(err)
+            if self._listener.is_cancelled:
+                return
+        if job["part"] is not None:
+            job["part"].close()
+        if (
+            job["last"]
+            and not self._listener.is_cancelled
+            and await aiopath.exists(self._up_path)
+        ):
+            await remove(self._up_path)
+
+    async def _add_file(self, dirpath, file_, pending, pipelined):
+        f_path = ospath.join(dirpath, file_)
+        parts = [None]
+        split_size = self._listener.split_files.get(ospath.normpath(f_path))
+        if split_size and await aiopath.exists(f_path):
+            parts = get_file_parts(f_path, await aiopath.getsize(f_path), split_size)
+        for part in parts:
+            file_name = file_ if part is None else part.name
+            self._error = ""
+            self._up_path = f_path
+            if not await aiopath.exists(self._up_path):
+                LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+                continue
+            try:
+                if part is None:
+                    f_size = await aiopath.getsize(self._up_path)
+                else:
+                    f_size = part.length
+                self._total_files += 1
+                if f_size == 0:
+                    LOGGER.error(
+                        f"{self._up_path} size is zero, telegram don't upload zero size files"
+                    )
+                    self._corrupted += 1
+                    continue
+                if self._listener.is_cancelled:
+                    return False
+                cap_mono = await self._prepare_file(file_name, dirpath, part)
+            except Exception as err:
+                self._on_upload_error(err)
+                if self._listener.is_cancelled:
+                    return False
+                if part is None and await aiopath.exists(self._up_path):
+                    await remove(self._up_path)
+                continue
+            job = {
+                "path": self._up_path,
+                "o_path": ospath.join(dirpath, file_name),
+                "file": file_name,
+                "size": f_size,
+                "cap_mono": cap_mono,
+                "part": part,
+                "last": part is parts[-1],
+            }
+            if pipelined:
+                self._stage(job)
+                pending.append(job)
+            else:
+                await self._process_file(job)
+                if self._listener.is_cancelled:
+                    return False
+        return True
+
+    async def _add_split_parts(self, dirpath, file_, queue, pending, pipelined):
+        emitted = 0
+        while part_path := await queue.get():
+            emitted += 1
+            if not await self._add_file(
+                dirpath, ospath.basename(part_path), pending, pipelined
+            ):
+                return False
+        f_path = ospath.join(dirpath, file_)
+        if part_path is None:
+            if await aiopath.exists(f_path):
+                await remove(f_path)
+        elif emitted:
+            self._error = f"Split stopped after {emitted} parts!"
+            LOGGER.error(f"{self._error} Path: {f_path}")
+            self._corrupted += 1
+        else:
+            return await self._add_file(dirpath, file_, pending, pipelined)
+        return True
+
+    def _is_split_part(self, dirpath, file_):
+        for f_path in self._listener.split_queues:
+            base_name, extension = ospath.splitext(ospath.basename(f_path))
+            if ospath.dirname(f_path) == ospath.normpath(dirpath) and re_match(
+                rf"{escape(base_name)}\.part\d{{3}}{escape(extension)}$", file_
+            ):
+                return True
+        return False
+
+    async def _upload_files(self, pipelined):
+        pending = []
         for dirpath, _, files in natsorted(await sync_to_async(walk, self._path)):
             if dirpath.strip().endswith("/yt-dlp-thumb"):
                 continue
             if dirpath.strip().endswith("_mltbss"):
-                await self._send_screenshots(dirpath, files)
-                await rmtree(dirpath, ignore_errors=True)
+                job = {"dirpath": dirpath, "screenshots": files}
+                if pipelined:
+                    pending.append(job)
+                else:
+                    await self._process_file(job)
                 continue
             for file_ in natsorted(files):
-                self._error = ""
-                self._up_path = f_path = ospath.join(dirpath, file_)
-                if not await aiopath.exists(self._up_path):
-                    LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+                f_path = ospath.normpath(ospath.join(dirpath, file_))
+                if queue := self._listener.split_queues.get(f_path):
+                    res = await self._add_split_parts(
+                        dirpath, file_, queue, pending, pipelined
+                    )
+                elif self._is_split_part(dirpath, file_):
                     continue
-                try:
-                    f_size = await aiopath.getsize(self._up_path)
-                    self._total_files += 1
-                    if f_size == 0:
-                        LOGGER.error(
-                            f"{self._up_path} size is zero, telegram don't upload zero size files"
-                        )
-                        self._corrupted += 1
-                        continue
-                    if self._listener.is_cancelled:
-                        return
-                    cap_mono = await self._prepare_file(file_, dirpath)
-                    if self._last_msg_in_group:
-                        group_lists = [
-                            x for v in self._media_dict.values() for x in v.keys()
-                        ]
-                        match = re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", f_path)
-                        if not match or match and match.group(0) not in group_lists:
-                            for key, value in list(self._media_dict.items()):
-                                for subkey, msgs in list(value.items()):
-                                    if len(msgs) > 1:
-                                        await self._send_media_group(subkey, key, msgs)
-                    if self._listener.hybrid_leech and self._listener.user_transmission:
-                        self._user_session = f_size > 2097152000
-                        if self._user_session:
-                            self._sent_msg = await TgClient.user.get_messages(
-                                chat_id=self._sent_msg.chat.id,
-                                message_ids=self._sent_msg.id,
-                            )
-                        else:
-                            self._sent_msg = await self._listener.client.get_messages(
-                                chat_id=self._sent_msg.chat.id,
-                                message_ids=self._sent_msg.id,
-                            )
-                    self._last_msg_in_group = False
-                    self._last_uploaded = 0
-                    await self._upload_file(cap_mono, file_, f_path)
-                    if self._log_msg and not is_log_del and Config.CLEAN_LOG_MSG:
-                        await delete_message(self._log_msg)
-                        is_log_del = True
-                    if self._listener.is_cancelled:
-                        return
-                    if (
-                        not self._is_corrupted
-                        and (self._listener.is_super_chat or self._listener.up_dest)
-                        and not self._is_private
-                    ):
-                        self._msgs_dict[self._sent_msg.link] = file_
-                    await sleep(1)
-                except Exception as err:
-                    if isinstance(err, RetryError):
-                        LOGGER.info(
-                            f"Total Attempts: {err.last_attempt.attempt_number}"
-                        )
-                        err = err.last_attempt.exception()
-                    LOGGER.error(f"{err}. Path: {self._up_path}", exc_info=True)
-                    self._error = str(err)
-                    self._corrupted += 1
-                    if self._listener.is_cancelled:
-                        return
-                if not self._listener.is_cancelled and await aiopath.exists(
-                    self._up_path
-                ):
-                    await remove(self._up_path)
+                else:
+                    res = await self._add_file(dirpath, file_, pending, pipelined)
+                if not res:
+                    return
+        for queue in self._stage_queues:
+            queue.put_nowait(None)
+        for job in pending:
+            await self._process_file(job)
+            if self._listener.is_cancelled:
+                return
+
+    async def upload(self):
+        await self._user_settings()
+        res = await self._msg_to_reply()
+        if not res:
+            return
+        stage_tasks = self._start_stage_workers()
+        try:
+            await self._upload_files(bool(stage_tasks))
+        finally:
+            for task in stage_tasks:
+                task.cancel()
+        if self._listener.is_cancelled:
+            return
         for key, value in list(self._media_dict.items()):
             for subkey, msgs in list(value.items()):
                 if len(msgs) > 1:
@@ -429,7 +682,74 @@ class TelegramUploader:
         stop=stop_after_attempt(3),
         retry=retry_if_exception_type(Exception),
     )
-    async def _upload_file(self, cap_mono, file, o_path, force_document=False):
+    async def _stage_file(self, client, chat_id, thread_id, job):
+        self._processed_bytes -= job.get("sent", 0)
+        job["sent"] = 0
+        return await self._send_file(
+            (client, chat_id, thread_id),
+            job["part"] or job["path"],
+            job["cap_mono"],
+            job["file"],
+            self._stage_progress(client, job),
+        )
+
+    @retry(
+        wait=wait_exponential(multiplier=2, min=4, max=8),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    async def _upload_file(self, up_path, cap_mono, file, o_path, force_document=False):
+        self._is_corrupted = False
+        sent_msg = await self._send_file(
+            self._sent_msg,
+            up_path,
+            cap_mono,
+            file,
+            self._upload_progress,
+            force_document,
+        )
+        if sent_msg:
+            self._sent_msg = sent_msg
+            await self._on_file_sent(o_path)
+
+    async def _on_file_sent(self, o_path):
+        if (
+            not self._listener.is_cancelled
+            and self._media_group
+            and (self._sent_msg.video or self._sent_msg.document)
+        ):
+            key = "documents" if self._sent_msg.document else "videos"
+            if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
+                pname = match.group(0)
+                if pname in self._media_dict[key].keys():
+                    self._media_dict[key][pname].append(
+                        [self._sent_msg.chat.id, self._sent_msg.id]
+                    )
+                else:
+                    self._media_dict[key][pname] = [
+                        [self._sent_msg.chat.id, self._sent_msg.id]
+                    ]
+                msgs = self._media_dict[key][pname]
+                if len(msgs) == 10:
+                    await self._send_media_group(pname, key, msgs)
+                else:
+                    self._last_msg_in_group = True
+        await self._copy_media()
+
+    @staticmethod
+    def _get_sender(send_to, media):
+        if isinstance(send_to, tuple):
+            client, chat_id, thread_id = send_to
+            return partial(
+                getattr(client, f"send_{media}"),
+                chat_id,
+                message_thread_id=thread_id,
+            )
+        return partial(getattr(send_to, f"reply_{media}"), quote=True)
+
+    async def _send_file(
+        self, send_to, up_path, cap_mono, file, progress, force_document=False
+    ):
         if (
             self._thumb is not None
             and not await aiopath.exists(self._thumb)
@@ -437,9 +757,12 @@ class TelegramUploader:
         ):
             self._thumb = None
         thumb = self._thumb
-        self._is_corrupted = False
+        key = ""
         try:
-            is_video, is_audio, is_image = await get_document_type(self._up_path)
+            if isinstance(up_path, FilePart):
+                is_video, is_audio, is_image = False, False, False
+            else:
+                is_video, is_audio, is_image = await get_document_type(up_path)
 
             if not is_image and thumb is None:
                 file_name = ospath.splitext(file)[0]
@@ -447,7 +770,7 @@ class TelegramUploader:
                 if await aiopath.isfile(thumb_path):
                     thumb = thumb_path
                 elif is_audio and not is_video:
-                    thumb = await get_audio_thumbnail(self._up_path)
+                    thumb = await get_audio_thumbnail(up_path)
 
             if (
                 self._listener.as_doc
@@ -456,32 +779,31 @@ class TelegramUploader:
             ):
                 key = "documents"
                 if is_video and thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, None)
+                    thumb = await get_video_thumbnail(up_path, None)
 
                 if self._listener.is_cancelled:
                     return
                 if thumb == "none":
                     thumb = None
-                self._sent_msg = await self._sent_msg.reply_document(
-                    document=self._up_path,
-                    quote=True,
+                sent_msg = await self._get_sender(send_to, "document")(
+                    document=up_path,
                     thumb=thumb,
                     caption=cap_mono,
                     force_document=True,
                     disable_notification=True,
-                    progress=self._upload_progress,
+                    progress=progress,
                 )
             elif is_video:
                 key = "videos"
-                duration = (await get_media_info(self._up_path))[0]
+                duration = (await get_media_info(up_path))[0]
                 if thumb is None and self._listener.thumbnail_layout:
                     thumb = await get_multiple_frames_thumbnail(
-                        self._up_path,
+                        up_path,
                         self._listener.thumbnail_layout,
                         self._listener.screen_shots,
                     )
                 if thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, duration)
+                    thumb = await get_video_thumbnail(up_path, duration)
                 if thumb is not None and thumb != "none":
                     with Image.open(thumb) as img:
                         width, height = img.size
@@ -492,9 +814,8 @@ class TelegramUploader:
                     return
                 if thumb == "none":
                     thumb = None
-                self._sent_msg = await self._sent_msg.reply_video(
-                    video=self._up_path,
-                    quote=True,
+                sent_msg = await self._get_sender(send_to, "video")(
+                    video=up_path,
                     caption=cap_mono,
                     duration=duration,
                     width=width,
@@ -502,69 +823,43 @@ class TelegramUploader:
                     thumb=thumb,
                     supports_streaming=True,
                     disable_notification=True,
-                    progress=self._upload_progress,
+                    progress=progress,
                 )
             elif is_audio:
                 key = "audios"
-                duration, artist, title = await get_media_info(self._up_path)
+                duration, artist, title = await get_media_info(up_path)
                 if self._listener.is_cancelled:
                     return
                 if thumb == "none":
                     thumb = None
-                self._sent_msg = await self._sent_msg.reply_audio(
-                    audio=self._up_path,
-                    quote=True,
+                sent_msg = await self._get_sender(send_to, "audio")(
+                    audio=up_path,
                     caption=cap_mono,
                     duration=duration,
                     performer=artist,
                     title=title,
                     thumb=thumb,
                     disable_notification=True,
-                    progress=self._upload_progress,
+                    progress=progress,
                 )
             else:
                 key = "photos"
                 if self._listener.is_cancelled:
                     return
-                self._sent_msg = await self._sent_msg.reply_photo(
-                    photo=self._up_path,
-                    quote=True,
+                sent_msg = await self._get_sender(send_to, "photo")(
+                    photo=up_path,
                     caption=cap_mono,
                     disable_notification=True,
-                    progress=self._upload_progress,
+                    progress=progress,
                 )
 
-            if (
-                not self._listener.is_cancelled
-                and self._media_group
-                and (self._sent_msg.video or self._sent_msg.document)
-            ):
-                key = "documents" if self._sent_msg.document else "videos"
-                if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
-                    pname = match.group(0)
-                    if pname in self._media_dict[key].keys():
-                        self._media_dict[key][pname].append(
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        )
-                    else:
-                        self._media_dict[key][pname] = [
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        ]
-                    msgs = self._media_dict[key][pname]
-                    if len(msgs) == 10:
-                        await self._send_media_group(pname, key, msgs)
-                    else:
-                        self._last_msg_in_group = True
-
-            if self._sent_msg:
-                await self._copy_media()
-
             if (
                 self._thumb is None
                 and thumb is not None
                 and await aiopath.exists(thumb)
             ):
                 await remove(thumb)
+            return sent_msg
         except (FloodWait, FloodPremiumWait) as f:
             LOGGER.warning(str(f))
             await sleep(f.value * 1.3)
@@ -574,7 +869,9 @@ class TelegramUploader:
                 and await aiopath.exists(thumb)
             ):
                 await remove(thumb)
-            return await self._upload_file(cap_mono, file, o_path)
+            return await self._send_file(
+                send_to, up_path, cap_mono, file, progress, force_document
+            )
         except Exception as err:
             if (
                 self._thumb is None
@@ -583,10 +880,12 @@ class TelegramUploader:
             ):
                 await remove(thumb)
             err_type = "RPCError: " if isinstance(err, RPCError) else ""
-            LOGGER.error(f"{err_type}{err}. Path: {self._up_path}", exc_info=True)
+            LOGGER.error(f"{err_type}{err}. Path: {up_path}", exc_info=True)
             if isinstance(err, BadRequest) and key != "documents":
-                LOGGER.error(f"Retrying As Document. Path: {self._up_path}")
-                return await self._upload_file(cap_mono, file, o_path, True)
+                LOGGER.error(f"Retrying As Document. Path: {up_path}")
+                return await self._send_file(
+                    send_to, up_path, cap_mono, file, progress, True
+                )
             raise err
 
     @property
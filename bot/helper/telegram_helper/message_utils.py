@@ -25,7 +25,11 @@ from ...core.config_manager import Config
 from ...core.tg_client import TgClient
 from ..ext_utils.bot_utils import SetInterval
 from ..ext_utils.exceptions import TgLinkException
-from ..ext_utils.status_utils import get_readable_message
+from ..ext_utils.status_utils import (
+    STATS_REFRESH_INTERVAL,
+    get_readable_message,
+    get_status_hash,
+)
 
 
 async def send_message(message, text, buttons=None, block=True, photo=None, **kwargs):
@@ -170,7 +174,7 @@ async def send_rss(text, chat_id, thread_id):
     except (FloodWait, FloodPremiumWait) as f:
         LOGGER.warning(str(f))
         await sleep(f.value * 1.2)
-        return await send_rss(text)
+        return await send_rss(text, chat_id, thread_id)
     except Exception as e:
         LOGGER.error(str(e), exc_info=True)
         return str(e)
@@ -307,7 +311,12 @@ async def update_status_message(sid, force=False):
                 obj.cancel()
                 del intervals["status"][sid]
             return
-        if text != status_dict[sid]["message"].text:
+        page_hash = get_status_hash(text, buttons)
+        if (
+            force
+            or page_hash != status_dict[sid].get("hash")
+            or time() - status_dict[sid].get("edited", 0) >= STATS_REFRESH_INTERVAL
+        ):
             message = await edit_message(
                 status_dict[sid]["message"], text, buttons, block=False
             )
@@ -323,7 +332,8 @@ async def update_status_message(sid, force=False):
                     )
                 return
             status_dict[sid]["message"].text = text
-            status_dict[sid]["time"] = time()
+            status_dict[sid]["hash"] = page_hash
+            status_dict[sid]["time"] = status_dict[sid]["edited"] = time()
 
 
 async def send_status_message(msg, user_id=0):
@@ -354,7 +364,14 @@ async def send_status_message(msg, user_id=0):
                 return
             await delete_message(old_message)
             message.text = text
-            status_dict[sid].update({"message": message, "time": time()})
+            status_dict[sid].update(
+                {
+                    "message": message,
+                    "time": time(),
+                    "edited": time(),
+                    "hash": get_status_hash(text, buttons),
+                }
+            )
         else:
             text, buttons = await get_readable_message(sid, is_user)
             if text is None:
@@ -369,6 +386,8 @@ async def send_status_message(msg, user_id=0):
             status_dict[sid] = {
                 "message": message,
                 "time": time(),
+                "edited": time(),
+                "hash": get_status_hash(text, buttons),
                 "page_no": 1,
                 "page_step": 1,
                 "status": "All",
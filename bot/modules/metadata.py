@@ -6,10 +6,11 @@ from os import path as ospath, walk
 from aiofiles.os import path as aiopath, remove
 from aioshutil import move
 
-from .. import LOGGER, cpu_eater_lock, task_dict, task_dict_lock
+from .. import LOGGER, task_dict, task_dict_lock
 from ..core.config_manager import BinConfig
 from ..helper.ext_utils.bot_utils import sync_to_async
 from ..helper.ext_utils.files_utils import get_path_size
+from ..helper.ext_utils.media_scheduler import COPY_WEIGHT, media_scheduler
 from ..helper.ext_utils.media_utils import (
     FFMpeg,
     get_document_type,
@@ -37,7 +38,7 @@ async def apply_metadata_title(self, dl_path, gid, metadata_dict, audio_metadata
     async with task_dict_lock:
         task_dict[self.mid] = MetadataStatus(self, ffmpeg, gid, "up")
     self.progress = False
-    await cpu_eater_lock.acquire()
+    await media_scheduler.acquire(self, COPY_WEIGHT)
     self.progress = True
 
     try:
@@ -58,7 +59,7 @@ async def apply_metadata_title(self, dl_path, gid, metadata_dict, audio_metadata
             if not streams:
                 LOGGER.error(f"Error getting streams for {file_path}. Skipping.")
                 if is_file: 
-                    cpu_eater_lock.release()
+                    media_scheduler.release(self)
                     return dl_path
                 continue
 
@@ -118,5 +119,5 @@ async def apply_metadata_title(self, dl_path, gid, metadata_dict, audio_metadata
                 if await aiopath.exists(temp_out): 
                     await remove(temp_out)
     finally:
-        cpu_eater_lock.release()
+        media_scheduler.release(self)
     return dl_path
@@ -17,6 +17,7 @@ from ..core.torrent_manager import TorrentManager
 from ..helper.ext_utils.bot_utils import new_task
 from ..helper.ext_utils.db_handler import database
 from ..helper.ext_utils.files_utils import clean_all
+from ..helper.ext_utils.hyperdl_utils import MediaSessionPool
 from ..helper.telegram_helper import button_build
 from ..helper.telegram_helper.message_utils import (
     delete_message,
@@ -123,6 +124,7 @@ async def confirm_restart(_, query):
         intervals["stopAll"] = True
         restart_message = await send_message(reply_to, "<i>Restarting...</i>")
         await delete_message(message)
+        await MediaSessionPool.close_all()
         await TgClient.stop()
         if scheduler.running:
             scheduler.shutdown(wait=False)
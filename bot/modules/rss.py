@@ -1,6 +1,6 @@
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 from apscheduler.triggers.interval import IntervalTrigger
-from asyncio import Lock, sleep
+from asyncio import Lock, Queue, Semaphore, gather, sleep
 from datetime import datetime, timedelta
 from feedparser import parse as feed_parse
 from functools import partial
@@ -8,14 +8,13 @@ from io import BytesIO
 from pyrogram.filters import create
 from pyrogram.handlers import MessageHandler
 from time import time
-from re import compile, I
+from re import compile, escape as re_escape, I
 
-from .. import scheduler, rss_dict, LOGGER
+from .. import bot_loop, scheduler, rss_dict, LOGGER
 from ..core.config_manager import Config
 from ..helper.ext_utils.bot_utils import new_task, arg_parser, get_size_bytes
 from ..helper.ext_utils.status_utils import get_readable_file_size
 from ..helper.ext_utils.db_handler import database
-from ..helper.ext_utils.exceptions import RssShutdownException
 from ..helper.ext_utils.help_messages import RSS_HELP_MESSAGE
 from ..helper.telegram_helper.button_build import ButtonMaker
 from ..helper.telegram_helper.filters import CustomFilters
@@ -27,7 +26,17 @@ from ..helper.telegram_helper.message_utils import (
     delete_message,
 )
 
+RSS_FETCH_LIMIT = 10
+RSS_SEND_DELAY = 10
+RSS_MAX_BACKOFF = 4
+
 rss_dict_lock = Lock()
+rss_fetch_limit = Semaphore(RSS_FETCH_LIMIT)
+rss_send_queue = Queue()
+rss_client = None
+rss_sender = None
+feed_states = {}
+feed_filters = {}
 handler_dict = {}
 size_regex = compile(r"(\d+(\.\d+)?\s?(GB|MB|KB|GiB|MiB|KiB))", I)
 
@@ -133,10 +142,7 @@ async def rss_sub(_, message, pre_event):
             cmd = None
             stv = False
         try:
-            async with AsyncClient(
-                headers=headers, follow_redirects=True, timeout=60, verify=False
-            ) as client:
-                res = await client.get(feed_link)
+            res = await get_rss_client().get(feed_link)
             html = res.text
             rss_d = feed_parse(html)
             last_title = rss_d.entries[0]["title"]
@@ -346,10 +352,7 @@ async def rss_get(_, message, pre_event):
                 msg = await send_message(
                     message, f"Getting the last <b>{count}</b> item(s) from {title}"
                 )
-                async with AsyncClient(
-                    headers=headers, follow_redirects=True, timeout=60, verify=False
-                ) as client:
-                    res = await client.get(data["link"])
+                res = await get_rss_client().get(data["link"])
                 html = res.text
                 rss_d = feed_parse(html)
                 item_info = ""
@@ -657,6 +660,217 @@ Timeout: 60 sec. Argument -c for command and arguments
             await query.answer(text="Already Running!", show_alert=True)
 
 
+class RssFilter:
+    def __init__(self, inf, exf, sensitive):
+        self._lower = sensitive
+        norm = str.lower if sensitive else str
+        self._include = tuple(tuple({norm(x) for x in flist}) for flist in inf)
+        exf_words = {norm(x) for flist in exf for x in flist}
+        self._exclude_all = "" in exf_words
+        self._exclude = (
+            compile(
+                "|".join(map(re_escape, sorted(exf_words, key=len, reverse=True)))
+            ).search
+            if exf_words
+            else None
+        )
+
+    def match(self, item_title):
+        if self._lower:
+            item_title = item_title.lower()
+        for words in self._include:
+            for word in words:
+                if word in item_title:
+                    break
+            else:
+                return False
+        return not (self._exclude_all or (self._exclude and self._exclude(item_title)))
+
+
+def get_feed_filter(user, title, data):
+    key = (
+        repr(data["inf"]),
+        repr(data["exf"]),
+        bool(data.get("sensitive", False)),
+    )
+    cached = feed_filters.get((user, title))
+    if cached is None or cached[0] != key:
+        cached = (
+            key,
+            RssFilter(data["inf"], data["exf"], data.get("sensitive", False)),
+        )
+        feed_filters[(user, title)] = cached
+    return cached[1]
+
+
+def get_rss_client():
+    global rss_client
+    if rss_client is None or rss_client.is_closed:
+        rss_client = AsyncClient(
+            headers=headers,
+            follow_redirects=True,
+            timeout=60,
+            verify=False,
+            limits=Limits(
+                max_connections=RSS_FETCH_LIMIT * 2,
+                max_keepalive_connections=RSS_FETCH_LIMIT,
+            ),
+        )
+    return rss_client
+
+
+async def _fetch_feed(link, state):
+    req_headers = {}
+    if state.get("etag"):
+        req_headers["If-None-Match"] = state["etag"]
+    if state.get("modified"):
+        req_headers["If-Modified-Since"] = state["modified"]
+    tries = 0
+    while True:
+        try:
+            res = await get_rss_client().get(link, headers=req_headers)
+            break
+        except Exception:
+            tries += 1
+            if tries > 3:
+                raise
+            continue
+    if res.status_code == 304:
+        return None, {}
+    return feed_parse(res.text), {
+        "etag": res.headers.get("ETag"),
+        "modified": res.headers.get("Last-Modified"),
+    }
+
+
+def _get_feed_messages(user, title, data, rss_d):
+    feed_filter = get_feed_filter(user, title, data)
+    messages = []
+    feed_count = 0
+    while True:
+        try:
+            item_title = rss_d.entries[feed_count]["title"]
+            try:
+                url = rss_d.entries[feed_count]["links"][1]["href"]
+            except IndexError:
+                url = rss_d.entries[feed_count]["link"]
+            if data["last_feed"] == url or data["last_title"] == item_title:
+                break
+        except IndexError:
+            LOGGER.warning(
+                f"Reached Max index no. {feed_count} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents"
+            )
+            break
+        entry = rss_d.entries[feed_count]
+        feed_count += 1
+        if not feed_filter.match(item_title):
+            continue
+        if entry.get("size"):
+            size = int(entry["size"])
+        elif entry.get("summary") and (match := size_regex.search(entry["summary"])):
+            size = get_size_bytes(match.group(1))
+        else:
+            size = 0
+        if command := data["command"]:
+            if size and Config.RSS_SIZE_LIMIT and Config.RSS_SIZE_LIMIT < size:
+                continue
+            cmd = command.split(maxsplit=1)
+            cmd.insert(1, url)
+            feed_msg = " ".join(cmd)
+            if not feed_msg.startswith("/"):
+                feed_msg = f"/{feed_msg}"
+        else:
+            feed_msg = f"<b>Name: </b><code>{item_title.replace('>', '').replace('<', '')}</code>"
+            feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
+            if size:
+                feed_msg += f"\n<b>Size: </b>{get_readable_file_size(size)}"
+        feed_msg += f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
+        messages.append(feed_msg)
+    return messages
+
+
+async def _update_feed(user, title, last_link, last_title, validators):
+    async with rss_dict_lock:
+        if user not in rss_dict or not rss_dict[user].get(title, False):
+            return
+        rss_dict[user][title].update({"last_feed": last_link, "last_title": last_title})
+    feed_states[(user, title)].update(validators)
+    await database.rss_update(user)
+    LOGGER.info(f"Feed Name: {title}")
+    LOGGER.info(f"Last item: {last_link}")
+
+
+async def _rss_sender():
+    while not rss_send_queue.empty():
+        user, title, messages, marker, chat_id, thread_id = rss_send_queue.get_nowait()
+        try:
+            for feed_msg in messages:
+                if not scheduler.running:
+                    break
+                await send_rss(feed_msg, chat_id, thread_id)
+                await sleep(RSS_SEND_DELAY)
+            else:
+                await _update_feed(user, title, *marker)
+        except Exception as e:
+            LOGGER.error(f"{e} - Feed Name: {title}")
+        finally:
+            feed_states[(user, title)]["pending"] = False
+
+
+def _queue_rss(user, title, messages, marker, chat_id, thread_id):
+    global rss_sender
+    feed_states[(user, title)]["pending"] = True
+    rss_send_queue.put_nowait((user, title, messages, marker, chat_id, thread_id))
+    if rss_sender is None or rss_sender.done():
+        rss_sender = bot_loop.create_task(_rss_sender())
+
+
+def _backoff_feed(state, has_new):
+    if has_new:
+        state["backoff"] = 1
+    else:
+        state["backoff"] = min(state["backoff"] * 2, RSS_MAX_BACKOFF)
+    state["wait"] = state["backoff"] - 1
+
+
+async def _check_feed(user, title, data, chat_id, thread_id):
+    state = feed_states.setdefault(
+        (user, title), {"backoff": 1, "wait": 0, "pending": False}
+    )
+    if state["pending"]:
+        return
+    if state["wait"] > 0:
+        state["wait"] -= 1
+        return
+    async with rss_fetch_limit:
+        rss_d, validators = await _fetch_feed(data["link"], state)
+    if rss_d is None:
+        _backoff_feed(state, False)
+        return
+    try:
+        last_link = rss_d.entries[0]["links"][1]["href"]
+    except IndexError:
+        last_link = rss_d.entries[0]["link"]
+    last_title = rss_d.entries[0]["title"]
+    if data["last_feed"] == last_link or data["last_title"] == last_title:
+        state.update(validators)
+        _backoff_feed(state, False)
+        return
+    _backoff_feed(state, True)
+    marker = (last_link, last_title, validators)
+    if messages := _get_feed_messages(user, title, data, rss_d):
+        _queue_rss(user, title, messages, marker, chat_id, thread_id)
+    else:
+        await _update_feed(user, title, *marker)
+
+
+async def _check_feed_safe(user, title, data, chat_id, thread_id):
+    try:
+        await _check_feed(user, title, data, chat_id, thread_id)
+    except Exception as e:
+        LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
+
+
 async def rss_monitor():
     chat = Config.RSS_CHAT
     if not chat:
@@ -666,7 +880,6 @@ async def rss_monitor():
     if len(rss_dict) == 0:
         scheduler.pause()
         return
-    all_paused = True
     rss_topic_id = rss_chat_id = None
     if isinstance(chat, int):
         rss_chat_id = chat
@@ -679,133 +892,21 @@ async def rss_monitor():
         )
     elif chat.lstrip("-").isdigit():
         rss_chat_id = int(chat)
-    for user, items in list(rss_dict.items()):
-        for title, data in items.items():
-            try:
-                if data["paused"]:
-                    continue
-                tries = 0
-                while True:
-                    try:
-                        async with AsyncClient(
-                            headers=headers,
-                            follow_redirects=True,
-                            timeout=60,
-                            verify=False,
-                        ) as client:
-                            res = await client.get(data["link"])
-                        html = res.text
-                        break
-                    except Exception:
-                        tries += 1
-                        if tries > 3:
-                            raise
-                        continue
-                rss_d = feed_parse(html)
-                try:
-                    last_link = rss_d.entries[0]["links"][1]["href"]
-                except IndexError:
-                    last_link = rss_d.entries[0]["link"]
-                finally:
-                    all_paused = False
-                last_title = rss_d.entries[0]["title"]
-                if data["last_feed"] == last_link or data["last_title"] == last_title:
-                    continue
-                feed_count = 0
-                while True:
-                    try:
-                        await sleep(10)
-                    except Exception:
-                        raise RssShutdownException("Rss Monitor Stopped!")
-                    try:
-                        item_title = rss_d.entries[feed_count]["title"]
-                        try:
-                            url = rss_d.entries[feed_count]["links"][1]["href"]
-                        except IndexError:
-                            url = rss_d.entries[feed_count]["link"]
-                        if data["last_feed"] == url or data["last_title"] == item_title:
-                            break
-                        if rss_d.entries[feed_count].get("size"):
-                            size = int(rss_d.entries[feed_count]["size"])
-                        elif rss_d.entries[feed_count].get("summary"):
-                            summary = rss_d.entries[feed_count]["summary"]
-                            matches = size_regex.findall(summary)
-                            sizes = [match[0] for match in matches]
-                            size = get_size_bytes(sizes[0])
-                        else:
-                            size = 0
-                    except IndexError:
-                        LOGGER.warning(
-                            f"Reached Max index no. {feed_count} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents"
-                        )
-                        break
-                    parse = True
-                    for flist in data["inf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and all(x.lower() not in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and all(x not in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    for flist in data["exf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and any(x.lower() in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and any(x in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    if command := data["command"]:
-                        if (
-                            size
-                            and Config.RSS_SIZE_LIMIT
-                            and Config.RSS_SIZE_LIMIT < size
-                        ):
-                            feed_count += 1
-                            continue
-                        cmd = command.split(maxsplit=1)
-                        cmd.insert(1, url)
-                        feed_msg = " ".join(cmd)
-                        if not feed_msg.startswith("/"):
-                            feed_msg = f"/{feed_msg}"
-                    else:
-                        feed_msg = f"<b>Name: </b><code>{item_title.replace('>', '').replace('<', '')}</code>"
-                        feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
-                        if size:
-                            feed_msg += f"\n<b>Size: </b>{get_readable_file_size(size)}"
-                    feed_msg += (
-                        f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
-                    )
-                    await send_rss(feed_msg, rss_chat_id, rss_topic_id)
-                    feed_count += 1
-                async with rss_dict_lock:
-                    if user not in rss_dict or not rss_dict[user].get(title, False):
-                        continue
-                    rss_dict[user][title].update(
-                        {"last_feed": last_link, "last_title": last_title}
-                    )
-                await database.rss_update(user)
-                LOGGER.info(f"Feed Name: {title}")
-                LOGGER.info(f"Last item: {last_link}")
-            except RssShutdownException as ex:
-                LOGGER.info(ex)
-                break
-            except Exception as e:
-                LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
-                continue
-    if all_paused:
+    feeds = [
+        (user, title, data)
+        for user, items in list(rss_dict.items())
+        for title, data in list(items.items())
+        if not data["paused"]
+    ]
+    if not feeds:
         scheduler.pause()
+        return
+    await gather(
+        *(
+            _check_feed_safe(user, title, data, rss_chat_id, rss_topic_id)
+            for user, title, data in feeds
+        )
+    )
 
 
 def add_job():